@@ -5,6 +5,11 @@
 #              are available and how they're implemented.
 #              Don't modify the contents of this file.
 
+try:
+    import numpy
+except ImportError:  # batch hashing falls back to the scalar hash functions
+    numpy = None
+
 
 # -------------- Used by both HashMaps (SC & OA)  -------------- #
 
@@ -16,13 +21,23 @@ class DynamicArray:
     """
     Class implementing a Dynamic Array
     Supported methods are:
-    append, pop, swap, get_at_index, set_at_index, length
+    append, extend, pop, swap, fill, get_at_index, set_at_index, get_slice, length
+    and the unchecked accessors get_unchecked and set_unchecked for hot internal loops
     """
 
+    __slots__ = ('_data',)
+
     def __init__(self, arr=None) -> None:
         """Initialize new dynamic array using a list."""
         self._data = arr.copy() if arr else []
 
+    @classmethod
+    def filled(cls, length: int, value: object = None) -> "DynamicArray":
+        """Return a new array of the given length with every element set to value, in one allocation."""
+        array = cls()
+        array._data = [value] * length
+        return array
+
     def __iter__(self):
         """
         Disable iterator capability for DynamicArray class
@@ -45,6 +60,13 @@ class DynamicArray:
         """Add new element at the end of the array."""
         self._data.append(value)
 
+    def extend(self, values) -> None:
+        """Add every element of another DynamicArray or any iterable at the end of the array."""
+        if isinstance(values, DynamicArray):
+            self._data.extend(values._data)
+        else:
+            self._data.extend(values)
+
     def pop(self):
         """Remove element from end of the array and return it."""
         return self._data.pop()
@@ -53,31 +75,85 @@ class DynamicArray:
         """Swap two elements in array given their indices."""
         self._data[i], self._data[j] = self._data[j], self._data[i]
 
+    def fill(self, value: object, start: int = 0, end: int = None) -> None:
+        """Set every element from index start up to, not including, index end (default: the end) to value."""
+        if end is None:
+            end = len(self._data)
+        if start < 0 or end > len(self._data) or start > end:
+            raise DynamicArrayException
+        self._data[start:end] = [value] * (end - start)
+
     def get_at_index(self, index: int):
         """Return value of element at a given index."""
-        if index < 0 or index >= self.length():
+        if index < 0 or index >= len(self._data):
             raise DynamicArrayException
         return self._data[index]
 
     def __getitem__(self, index: int):
         """Return value of element at a given index using [] syntax."""
-        return self.get_at_index(index)
+        if index < 0 or index >= len(self._data):
+            raise DynamicArrayException
+        return self._data[index]
+
+    def get_slice(self, start: int = 0, end: int = None) -> list:
+        """Return a list of the elements from index start up to, not including, index end (default: the end)."""
+        if end is None:
+            end = len(self._data)
+        if start < 0 or end > len(self._data) or start > end:
+            raise DynamicArrayException
+        return self._data[start:end]
+
+    def get_unchecked(self, index: int):
+        """
+        Return value of element at a given index without a bounds check.
+        Only for internal loops whose indices are already known to be in range.
+        """
+        return self._data[index]
 
     def set_at_index(self, index: int, value: object) -> None:
         """Set value of element at a given index."""
-        if index < 0 or index >= self.length():
+        if index < 0 or index >= len(self._data):
             raise DynamicArrayException
         self._data[index] = value
 
     def __setitem__(self, index: int, value: object) -> None:
         """Set value of element at a given index using [] syntax."""
-        self.set_at_index(index, value)
+        if index < 0 or index >= len(self._data):
+            raise DynamicArrayException
+        self._data[index] = value
+
+    def set_unchecked(self, index: int, value: object) -> None:
+        """
+        Set value of element at a given index without a bounds check.
+        Only for internal loops whose indices are already known to be in range.
+        """
+        self._data[index] = value
 
     def length(self) -> int:
         """Return length of array."""
         return len(self._data)
 
 
+def as_list(source) -> list:
+    """
+    Return the elements of a DynamicArray or any other iterable as a list.
+    DynamicArray disables iteration, so its elements are read with one bulk slice.
+    """
+    if isinstance(source, DynamicArray):
+        return source.get_slice()
+    return list(source)
+
+
+def iter_elements(source):
+    """
+    Iterate over the elements of a DynamicArray or any other iterable without copying them,
+    so generators and other streams are consumed one element at a time.
+    """
+    if isinstance(source, DynamicArray):
+        return (source.get_unchecked(i) for i in range(source.length()))
+    return iter(source)
+
+
 def hash_function_1(key: str) -> int:
     """Sample Hash function #1 to be used with HashMap implementation"""
     hash = 0
@@ -96,6 +172,261 @@ def hash_function_2(key: str) -> int:
     return hash
 
 
+_FNV_OFFSET = 0xcbf29ce484222325
+_FNV_PRIME = 0x100000001b3
+MASK_64 = 0xFFFFFFFFFFFFFFFF  # keeps arithmetic on hashes to unsigned 64 bits
+GOLDEN_64 = 0x9E3779B97F4A7C15  # 2^64 / golden ratio, the usual multiplier of multiplicative hashing
+_MERSENNE_61 = (1 << 61) - 1
+
+
+def hash_function_fnv1a(key: str) -> int:
+    """64-bit FNV-1a hash of the UTF-8 bytes of the key. Order-sensitive and well spread."""
+    hash = _FNV_OFFSET
+    for byte in key.encode():
+        hash = ((hash ^ byte) * _FNV_PRIME) & MASK_64
+    return hash
+
+
+def make_polynomial_hash(seed: int = 0):
+    """
+    Return a seeded polynomial hash function: the key's code points are the coefficients of a
+    polynomial evaluated modulo 2^61 - 1 at a base derived from the seed, followed by a
+    multiplicative scramble so that keys differing only in their last character land far apart.
+    Different seeds give independent hash functions.
+    """
+    base = (seed * GOLDEN_64 + 0x2545F4914F6CDD1D) % (_MERSENNE_61 - (1 << 20)) + (1 << 20)
+
+    def hash_function_polynomial(key: str) -> int:
+        hash = seed & MASK_64
+        for letter in key:
+            hash = (hash * base + ord(letter)) % _MERSENNE_61
+        hash = (hash * GOLDEN_64) & MASK_64
+        return hash ^ (hash >> 29)
+
+    return hash_function_polynomial
+
+
+hash_function_polynomial = make_polynomial_hash()
+
+
+def hash_function_builtin(key: str) -> int:
+    """
+    Delegate to Python's built-in hash. Fastest option, but string hashes are randomized per
+    process (see PYTHONHASHSEED), so they must not be stored and reused by another process.
+    """
+    return hash(key)
+
+
+# keys are hashed in groups of similar length, each padded to at most _BATCH_ELEMENTS code points,
+# so a few long keys neither widen the rows of the short ones nor make the padded buffer huge
+_BATCH_ELEMENTS = 1 << 22
+
+
+def _code_points(keys: list):
+    """
+    Encode string keys into a zero-padded 2D array of Unicode code points, one row per key.
+    Return None if the keys are too long to hash exactly in int64.
+    """
+    codes = numpy.array(keys, dtype=str)
+    width = codes.dtype.itemsize // 4
+    if width * (width + 1) // 2 * 0x10FFFF >= 2 ** 63:
+        return None
+    return codes.view(numpy.uint32).reshape(len(keys), width).astype(numpy.int64)
+
+
+def _hash_batch(keys, weighted: bool, capacity: int) -> list:
+    """Shared body of hash_function_1_batch and hash_function_2_batch."""
+    keys = as_list(keys)
+    scalar = hash_function_2 if weighted else hash_function_1
+    if numpy is None or not all(type(key) is str for key in keys):
+        hashes = [scalar(key) for key in keys]
+        return [hash % capacity for hash in hashes] if capacity else hashes
+
+    # sort by length, then cut the order into groups whose keys are all shorter than twice the
+    # group's shortest key, so padding at most doubles a row, with rows limited by the element budget
+    lengths = numpy.fromiter(map(len, keys), dtype=numpy.int64, count=len(keys))
+    order = numpy.argsort(lengths, kind='stable')
+    lengths = lengths[order]
+    result = [None] * len(keys)
+    start = 0
+    while start < len(keys):
+        width = max(int(lengths[start]), 1)
+        end = min(int(numpy.searchsorted(lengths, 2 * width)), start + max(_BATCH_ELEMENTS // (2 * width), 1))
+        indices = order[start:end].tolist()
+        group = [keys[i] for i in indices]
+        codes = _code_points(group)
+        if codes is None:
+            hashes = numpy.array([scalar(key) for key in group], dtype=object)
+        elif weighted:
+            hashes = codes @ numpy.arange(1, codes.shape[1] + 1, dtype=numpy.int64)
+        else:
+            hashes = codes.sum(axis=1)
+        if capacity:
+            hashes = hashes % capacity
+        for i, hash in zip(indices, hashes.tolist()):
+            result[i] = hash
+        start = end
+    return result
+
+
+def hash_function_1_batch(keys, capacity: int = None) -> list:
+    """
+    Compute hash_function_1 for a sequence of keys at once, using NumPy when it is installed.
+    Return the full hashes, or the bucket indices if capacity is given.
+    """
+    return _hash_batch(keys, False, capacity)
+
+
+def hash_function_2_batch(keys, capacity: int = None) -> list:
+    """
+    Compute hash_function_2 for a sequence of keys at once, using NumPy when it is installed.
+    Return the full hashes, or the bucket indices if capacity is given.
+    """
+    return _hash_batch(keys, True, capacity)
+
+
+_BATCH_FUNCTIONS = {hash_function_1: hash_function_1_batch, hash_function_2: hash_function_2_batch}
+
+
+def hash_many(function, keys) -> list:
+    """
+    Return the full hash of every key in keys under the given hash function.
+    The shipped hash functions are computed in one vectorized batch; any other function is called per key.
+    """
+    batch = _BATCH_FUNCTIONS.get(function)
+    if batch is not None:
+        return batch(keys)
+    return [function(key) for key in as_list(keys)]
+
+
+# ------------- Capacity helpers for both HashMaps ------------- #
+
+def mix_hash(hash: int) -> int:
+    """
+    Finalize a hash with the 64-bit MurmurHash3 mixer, so that every bit of the input affects the
+    low bits. Power-of-two tables index with the low bits only, which weak hashes barely vary.
+    """
+    hash &= MASK_64
+    hash ^= hash >> 33
+    hash = (hash * 0xFF51AFD7ED558CCD) & MASK_64
+    hash ^= hash >> 33
+    hash = (hash * 0xC4CEB9FE1A85EC53) & MASK_64
+    return hash ^ (hash >> 33)
+
+
+def _mix_batch(hashes: list) -> list:
+    """Apply mix_hash to a list of hashes, as one vectorized pass when NumPy is installed."""
+    if numpy is None or not all(0 <= hash <= MASK_64 for hash in hashes):
+        return [mix_hash(hash) for hash in hashes]
+    mixed = numpy.array(hashes, dtype=numpy.uint64)  # uint64 arithmetic wraps modulo 2^64 by itself
+    shift = numpy.uint64(33)
+    mixed ^= mixed >> shift
+    mixed *= numpy.uint64(0xFF51AFD7ED558CCD)
+    mixed ^= mixed >> shift
+    mixed *= numpy.uint64(0xC4CEB9FE1A85EC53)
+    mixed ^= mixed >> shift
+    return mixed.tolist()
+
+
+_FINALIZED = {}  # hash function: its finalized wrapper, so every map shares one wrapper per function
+
+
+def finalized(function):
+    """
+    Return a hash function that computes mix_hash(function(key)).
+    The same wrapper is returned for the same function, and hash_many keeps batching it.
+    """
+    wrapper = _FINALIZED.get(function)
+    if wrapper is None:
+        def wrapper(key: str) -> int:
+            hash = function(key) & MASK_64  # mix_hash inlined, this runs on every operation
+            hash ^= hash >> 33
+            hash = (hash * 0xFF51AFD7ED558CCD) & MASK_64
+            hash ^= hash >> 33
+            hash = (hash * 0xC4CEB9FE1A85EC53) & MASK_64
+            return hash ^ (hash >> 33)
+
+        wrapper.__name__ = function.__name__ + '_finalized'
+        batch = _BATCH_FUNCTIONS.get(function)
+        if batch is not None:
+            _BATCH_FUNCTIONS[wrapper] = lambda keys: _mix_batch(batch(keys))
+        _FINALIZED[function] = wrapper
+    return wrapper
+
+
+def next_power_of_two(capacity: int) -> int:
+    """Return the smallest power of two that is at least capacity (and at least 1)."""
+    if capacity <= 1:
+        return 1
+    return 1 << (capacity - 1).bit_length()
+
+
+# numbers below _SIEVE_LIMIT are looked up in a sieve built on first use, larger ones are
+# tested with Miller-Rabin, so finding a table size never needs trial division
+_SIEVE_LIMIT = 1 << 20
+_sieve = None
+_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)  # deterministic for n < 3.3 * 10^24
+
+
+def _prime_sieve() -> bytearray:
+    """Return the sieve of Eratosthenes below _SIEVE_LIMIT: sieve[n] is 1 if n is prime."""
+    global _sieve
+    if _sieve is None:
+        sieve = bytearray([1]) * _SIEVE_LIMIT
+        sieve[0] = sieve[1] = 0
+        factor = 2
+        while factor * factor < _SIEVE_LIMIT:
+            if sieve[factor]:
+                sieve[factor * factor::factor] = bytes(len(range(factor * factor, _SIEVE_LIMIT, factor)))
+            factor += 1
+        _sieve = sieve
+    return _sieve
+
+
+def _miller_rabin(number: int) -> bool:
+    """Miller-Rabin primality test for an odd number greater than every witness."""
+    odd = number - 1
+    twos = 0
+    while odd % 2 == 0:
+        odd //= 2
+        twos += 1
+    for witness in _WITNESSES:
+        x = pow(witness, odd, number)
+        if x == 1 or x == number - 1:
+            continue
+        for _ in range(twos - 1):
+            x = x * x % number
+            if x == number - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def is_prime(number: int) -> bool:
+    """Return True if number is prime."""
+    if number < _SIEVE_LIMIT:
+        return number >= 2 and _prime_sieve()[number] == 1
+    return number % 2 == 1 and _miller_rabin(number)
+
+
+def next_prime(capacity: int) -> int:
+    """
+    Return the smallest odd prime that is at least capacity, the same number the maps'
+    _next_prime finds by trial division.
+    """
+    capacity = max(capacity, 3)
+    if capacity < _SIEVE_LIMIT:
+        prime = _prime_sieve().find(1, capacity)
+        if prime >= 0:
+            return prime
+        capacity = _SIEVE_LIMIT
+    capacity |= 1
+    while not _miller_rabin(capacity):
+        capacity += 2
+    return capacity
+
+
 # --------- For use in Separate Chaining (SC) HashMap  --------- #
 
 class SLNode:
@@ -103,11 +434,18 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    # no per-instance __dict__, nodes are the bulk of a separate chaining map's memory
+    __slots__ = ('key', 'value', 'next', 'hash')
+
+    def __init__(self, key: str, value: object, next: "SLNode" = None, hash: int = None) -> None:
+        """
+        Initialize node given a key and value.
+        hash is the full (pre-modulo) hash of the key, cached so the key never has to be rehashed.
+        """
         self.key = key
         self.value = value
         self.next = next
+        self.hash = hash
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -119,6 +457,8 @@ class LinkedListIterator:
     Separate iterator class for LinkedList
     """
 
+    __slots__ = ('_node',)
+
     def __init__(self, current_node: SLNode) -> None:
         """Initialize the iterator with a node."""
         self._node = current_node
@@ -141,9 +481,11 @@ class LinkedListIterator:
 class LinkedList:
     """
     Class implementing a Singly Linked List
-    Supported methods are: insert, remove, contains, length, iterator
+    Supported methods are: insert, insert_node, detach, remove, contains, length, iterator
     """
 
+    __slots__ = ('_head', '_size')
+
     def __init__(self) -> None:
         """
         Initialize new linked list;
@@ -168,20 +510,38 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
-        """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+    def insert(self, key: str, value: object, hash: int = None) -> SLNode:
+        """Insert new node at front of the list and return it."""
+        node = self._head = SLNode(key, value, self._head, hash)
+        self._size += 1
+        return node
+
+    def insert_node(self, node: SLNode) -> None:
+        """Link an existing node in at front of the list, without allocating a new one."""
+        node.next = self._head
+        self._head = node
         self._size += 1
 
-    def remove(self, key: str) -> bool:
+    def detach(self) -> SLNode:
+        """
+        Empty the list and return its former head node.
+        The detached nodes stay linked to each other through their next references.
+        """
+        head = self._head
+        self._head = None
+        self._size = 0
+        return head
+
+    def remove(self, key: str, hash: int = None) -> bool:
         """
         Remove first node with matching key.
+        If hash is given, nodes with a different cached hash are skipped without comparing keys.
         Return True if removal was successful, False otherwise.
         """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
@@ -192,9 +552,19 @@ class LinkedList:
             previous, node = node, node.next
         return False
 
-    def contains(self, key: str) -> SLNode:
-        """Return node with matching key, or None if no match"""
+    def contains(self, key: str, hash: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        If hash is given, nodes with a different cached hash are skipped without comparing keys.
+        """
         node = self._head
+        if hash is not None:
+            while node:
+                if node.hash == hash and node.key == key:
+                    return node
+                node = node.next
+            return node
+
         while node:
             if node.key == key:
                 return node
@@ -210,10 +580,17 @@ class LinkedList:
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
-        """Initialize an entry for use in a hash map."""
+    # no per-instance __dict__, entries are the bulk of an open addressing map's memory
+    __slots__ = ('key', 'value', 'hash', 'is_tombstone')
+
+    def __init__(self, key: str, value: object, hash: int = None) -> None:
+        """
+        Initialize an entry for use in a hash map.
+        hash is the full (pre-modulo) hash of the key, cached so the key never has to be rehashed.
+        """
         self.key = key
         self.value = value
+        self.hash = hash
 
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
@@ -221,3 +598,91 @@ class HashEntry:
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
         return f"K: {self.key} V: {self.value} TS: {self.is_tombstone}"
+
+
+# ---------- Views shared by every HashMap implementation  ---------- #
+
+class KeysView:
+    """
+    Live view of the keys of a hash map. Nothing is copied: iterating walks the map's table,
+    so the view always reflects the map's current contents. The map must not be changed while
+    one of its views or iterators is being iterated.
+    """
+
+    __slots__ = ('_map',)
+
+    def __init__(self, map) -> None:
+        """Initialize a view of the given hash map, which must iterate over entries with key and value."""
+        self._map = map
+
+    def __len__(self) -> int:
+        """Return the number of keys in the hash map."""
+        return self._map.get_size()
+
+    def __iter__(self):
+        """Iterate over the keys of the hash map."""
+        for entry in self._map:
+            yield entry.key
+
+    def __contains__(self, key: str) -> bool:
+        """Return True if the key is in the hash map."""
+        return self._map.contains_key(key)
+
+
+class ValuesView(KeysView):
+    """Live view of the values of a hash map, in the same order as its keys."""
+
+    __slots__ = ()
+
+    def __iter__(self):
+        """Iterate over the values of the hash map."""
+        for entry in self._map:
+            yield entry.value
+
+    def __contains__(self, value: object) -> bool:
+        """Return True if some key of the hash map is associated with the value."""
+        return any(entry.value == value for entry in self._map)
+
+
+class ItemsView(KeysView):
+    """Live view of the (key, value) pairs of a hash map."""
+
+    __slots__ = ()
+
+    def __iter__(self):
+        """Iterate over the (key, value) pairs of the hash map."""
+        for entry in self._map:
+            yield entry.key, entry.value
+
+    def __contains__(self, item: tuple) -> bool:
+        """Return True if item is a (key, value) pair of the hash map."""
+        key, value = item
+        return self._map.contains_key(key) and self._map.get(key) == value
+
+
+class MapViews:
+    """
+    Mixin giving a hash map the keys, values and items views. The map must iterate over entries
+    with key and value, and provide get_size, contains_key and get.
+    """
+
+    __slots__ = ()
+
+    def keys(self) -> KeysView:
+        """
+        Return a live view of the keys of the hash map, iterated without copying them.
+        """
+        return KeysView(self)
+
+    def values(self) -> ValuesView:
+        """
+        Return a live view of the values of the hash map, in the same order as keys().
+        """
+        return ValuesView(self)
+
+    def items(self) -> ItemsView:
+        """
+        Return a live view of the (key, value) pairs of the hash map, without building a tuple for every pair
+        up front as get_keys_and_values does.
+        """
+        return ItemsView(self)
@@ -0,0 +1,675 @@
+# Course: CS261 - Data Structures
+# Assignment: 6 - HashMap
+# Description: Benchmarks for the separate chaining (SC) and open addressing (OA, SoA and Robin Hood RH)
+# HashMap implementations.
+# Run this file directly to print the results, e.g.
+#   python benchmark.py suite --sizes 1000 100000 --output results.json
+#   python benchmark.py latency
+#   python benchmark.py memory
+#   python benchmark.py hashes
+#   python benchmark.py capacity
+#   python benchmark.py sweep
+#   python benchmark.py modes --workers 1 2 4 8
+#   python benchmark.py persist
+#   python benchmark.py frozen
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import hash_map_frozen
+import hash_map_io
+import hash_map_oa
+import hash_map_rh
+import hash_map_sc
+import hash_map_soa
+from a6_include import (DynamicArray, hash_function_1, hash_function_2, hash_function_builtin, hash_function_fnv1a,
+                        hash_function_polynomial, next_prime)
+
+# the prime sieve of a6_include is built on first use: build it now, so no traced measurement counts its 1 MB
+next_prime(3)
+
+HASH_FUNCTIONS = {
+    'hash_function_1': hash_function_1,
+    'hash_function_2': hash_function_2,
+    'fnv1a': hash_function_fnv1a,
+    'polynomial': hash_function_polynomial,
+    'builtin': hash_function_builtin,
+}
+
+
+def random_keys(count: int, length: int = 12, seed: int = 0) -> list:
+    """
+    Return a list of count distinct random lowercase keys.
+    :param count: number of keys
+    :param length: number of characters per key
+    :param seed: seed for the random generator, so runs are reproducible
+    :return: list of keys
+    """
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    keys = set()
+    while len(keys) < count:
+        keys.add(''.join(rng.choice(letters) for _ in range(length)))
+    return sorted(keys)
+
+
+def sequential_keys(count: int) -> list:
+    """Return count keys of the form 'str0', 'str1', ..."""
+    return ['str' + str(i) for i in range(count)]
+
+
+def anagram_keys(count: int) -> list:
+    """Return count distinct keys that are all permutations of the same letters."""
+    return [''.join(letters) for letters in itertools.islice(itertools.permutations('abcdefghijk'), count)]
+
+
+def hash_distribution(function, keys: list) -> dict:
+    """
+    Hash keys into a table with one bucket per key (the next prime), as separate chaining would at
+    load factor 1.0, and describe how evenly they spread.
+    :param function: hash function to test
+    :param keys: keys to hash
+    :return: dictionary with keys/second, share of distinct hash values, share of empty buckets
+             (about 0.368 for a uniform hash) and the longest chain
+    """
+    capacity = hash_map_sc.HashMap(len(keys)).get_capacity()
+    start = time.perf_counter()
+    hashes = [function(key) for key in keys]
+    elapsed = time.perf_counter() - start
+
+    chains = [0] * capacity
+    for hash in hashes:
+        chains[hash % capacity] += 1
+    return {
+        'keys_per_sec': len(keys) / elapsed,
+        'distinct': len(set(hashes)) / len(keys),
+        'empty': chains.count(0) / capacity,
+        'max_chain': max(chains),
+    }
+
+
+def bench_hash_functions(count: int = 100000) -> None:
+    """
+    Print throughput and distribution statistics for every hash function on several key sets.
+    :param count: number of keys per key set
+    :return: none
+    """
+    key_sets = (('sequential', sequential_keys(count)), ('random', random_keys(count)),
+                ('anagram', anagram_keys(count)))
+    print(f"{'function':<17}{'keys':<12}{'keys/s':>12}{'distinct':>10}{'empty':>8}{'max chain':>11}")
+    for name, function in HASH_FUNCTIONS.items():
+        for key_set, keys in key_sets:
+            result = hash_distribution(function, keys)
+            print(f"{name:<17}{key_set:<12}{result['keys_per_sec']:>12,.0f}{result['distinct']:>10.3f}"
+                  f"{result['empty']:>8.3f}{result['max_chain']:>11}")
+
+
+def put_latency(module, keys: list, function=hash, **options) -> dict:
+    """
+    Insert every key into a new map of the given module, timing each put separately.
+    :param module: hash_map_sc or hash_map_oa
+    :param keys: keys to insert
+    :param function: hash function for the map
+    :param options: extra keyword arguments for the HashMap constructor
+    :return: dictionary with the total time, worst single put and 99.9th percentile put, in seconds
+    """
+    m = module.HashMap(11, function, **options)
+    clock = time.perf_counter
+    latencies = []
+    gc.disable()  # keep garbage collector pauses out of the measurements, as timeit does
+    try:
+        for i, key in enumerate(keys):
+            start = clock()
+            m.put(key, i)
+            latencies.append(clock() - start)
+    finally:
+        gc.enable()
+    latencies.sort()
+    return {
+        'total': sum(latencies),
+        'max': latencies[-1],
+        'p999': latencies[int(len(latencies) * 0.999)],
+    }
+
+
+def bench_put_latency(sizes=(10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)) -> None:
+    """
+    Compare the worst-case put time of stop-the-world and incremental resizing as the map grows.
+    The builtin hash is used so that chain and probe lengths stay short and resizing dominates the tail.
+    :param sizes: numbers of keys to insert
+    :return: none
+    """
+    print(f"{'map':<4}{'mode':<14}{'keys':>10}{'total s':>10}{'p99.9 us':>10}{'max ms':>10}")
+    for size in sizes:
+        keys = random_keys(size)
+        for module, name in ((hash_map_sc, 'SC'), (hash_map_oa, 'OA')):
+            for incremental in (False, True):
+                result = put_latency(module, keys, incremental=incremental)
+                mode = 'incremental' if incremental else 'stop-world'
+                print(f"{name:<4}{mode:<14}{size:>10}{result['total']:>10.2f}"
+                      f"{result['p999'] * 1e6:>10.1f}{result['max'] * 1e3:>10.2f}")
+
+
+def bytes_per_entry(module, count: int, function=hash_function_builtin, **options) -> float:
+    """
+    Measure, with tracemalloc, the memory a map of count entries holds on to, per entry.
+    Keys and values are created before tracing starts, so only the map's own structures are counted.
+    :param module: hash_map_sc or hash_map_oa
+    :param count: number of entries
+    :param function: hash function for the map
+    :param options: extra keyword arguments for the HashMap constructor
+    :return: traced bytes divided by count
+    """
+    keys = random_keys(count)
+    values = list(range(count))
+    gc.collect()
+    tracemalloc.start()
+    m = module.HashMap(11, function, **options)
+    for key, value in zip(keys, values):
+        m.put(key, value)
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return used / count
+
+
+def bench_memory(sizes=(10 ** 4, 10 ** 5)) -> None:
+    """
+    Print the memory each map uses per stored entry.
+    :param sizes: numbers of entries
+    :return: none
+    """
+    print(f"{'map':<6}{'entries':>10}{'bytes/entry':>14}")
+    for size in sizes:
+        for name, module in MAPS.items():
+            print(f"{name:<6}{size:>10}{bytes_per_entry(module, size):>14.1f}")
+
+
+def capacity_mode(module, keys: list, function, power_of_two: bool) -> dict:
+    """
+    Grow a map of the given module from the default capacity by inserting every key, then look every key up.
+    :param module: hash_map_sc or hash_map_oa
+    :param keys: keys to insert and look up
+    :param function: hash function for the map
+    :param power_of_two: capacity mode of the map
+    :return: dictionary with nanoseconds per put and per get, number of resizes and milliseconds per resize
+    """
+    m = module.HashMap(11, function, power_of_two=power_of_two)
+    clock = time.perf_counter
+    gc.disable()  # keep garbage collector pauses out of the measurements, as timeit does
+    try:
+        start = clock()
+        for i, key in enumerate(keys):
+            m.put(key, i)
+        put_seconds = clock() - start
+        start = clock()
+        for key in keys:
+            m.get(key)
+        get_seconds = clock() - start
+    finally:
+        gc.enable()
+    stats = m.stats()
+    return {
+        'put_ns': put_seconds / len(keys) * 1e9,
+        'get_ns': get_seconds / len(keys) * 1e9,
+        'resizes': stats['resizes'],
+        'resize_ms': stats['resize_seconds'] / max(stats['resizes'], 1) * 1e3,
+    }
+
+
+def bench_capacity_modes(sizes=(10 ** 4, 10 ** 5), function=hash_function_builtin) -> None:
+    """
+    Compare prime capacities with modulo indexing against power-of-two capacities with a hash finalizer,
+    per operation and per resize, then compare finding the growth primes by trial division and by table.
+    :param sizes: numbers of keys to insert
+    :param function: hash function for the maps
+    :return: none
+    """
+    print(f"{'map':<4}{'mode':<7}{'keys':>10}{'put ns':>10}{'get ns':>10}{'resizes':>9}{'ms/resize':>11}")
+    for size in sizes:
+        keys = random_keys(size)
+        for module, name in ((hash_map_sc, 'SC'), (hash_map_oa, 'OA')):
+            for power_of_two in (False, True):
+                result = capacity_mode(module, keys, function, power_of_two)
+                mode = 'pow2' if power_of_two else 'prime'
+                print(f"{name:<4}{mode:<7}{size:>10}{result['put_ns']:>10.0f}{result['get_ns']:>10.0f}"
+                      f"{result['resizes']:>9}{result['resize_ms']:>11.3f}")
+
+    # the capacities a map passes through while doubling from 11 to beyond the largest size
+    growth = [11]
+    while growth[-1] < 100 * max(sizes):
+        growth.append(next_prime(growth[-1] * 2))
+    trial_division = hash_map_sc.HashMap()._next_prime
+    for name, find in (('trial division', trial_division), ('prime table', next_prime)):
+        start = time.perf_counter()
+        for capacity in growth:
+            find(capacity * 2)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<16}{len(growth)} growth primes up to {growth[-1]:,} in {elapsed * 1e3:.3f} ms")
+
+
+MAPS = {'sc': hash_map_sc, 'oa': hash_map_oa, 'soa': hash_map_soa, 'rh': hash_map_rh}
+WORKLOADS = ('put_heavy', 'get_heavy', 'mixed', 'delete_churn', 'resize_heavy')
+DISTRIBUTIONS = ('sequential', 'random', 'anagram', 'skewed')
+
+
+def workload_keys(distribution: str, count: int) -> list:
+    """
+    Return the distinct keys a workload draws from. 'skewed' uses random keys, but workload_ops
+    picks them with a Zipf-like bias instead of uniformly.
+    """
+    if distribution == 'sequential':
+        return sequential_keys(count)
+    if distribution == 'anagram':
+        return anagram_keys(count)
+    keys = random_keys(count)
+    random.Random(1).shuffle(keys)
+    return keys
+
+
+def workload_ops(workload: str, distribution: str, keys: list, seed: int = 0) -> tuple:
+    """
+    Build the operations of a workload ahead of time, so generating them is not measured.
+    :param workload: one of WORKLOADS
+    :param distribution: one of DISTRIBUTIONS
+    :param keys: keys from workload_keys
+    :param seed: seed for the random generator, so runs are reproducible
+    :return: tuple of (keys to load before timing, presize capacity or None, list of (operation, key))
+    """
+    rng = random.Random(seed)
+    count = len(keys)
+    half = keys[:count // 2]
+    if distribution == 'skewed':
+        weights = list(itertools.accumulate(1 / (rank + 1) ** 1.1 for rank in range(count)))
+
+        def pick(population, k):
+            return rng.choices(population, cum_weights=weights[:len(population)], k=k)
+    else:
+        def pick(population, k):
+            return rng.choices(population, k=k)
+
+    if workload == 'put_heavy':  # presized map, puts with repeated keys overwriting values
+        return [], count * 2, [('put', key) for key in pick(keys, count)]
+    if workload == 'get_heavy':  # roughly 90% hits and 10% misses
+        lookups = pick(keys, count)
+        misses = set(rng.sample(range(count), count // 10))
+        return keys, None, [('get', key + '#' if i in misses else key) for i, key in enumerate(lookups)]
+    if workload == 'mixed':  # 50% get, 30% put, 20% remove
+        ops = [('get', 'put', 'remove')[rng.choices((0, 1, 2), weights=(5, 3, 2))[0]] for _ in range(count)]
+        return half, None, list(zip(ops, pick(keys, count)))
+    if workload == 'delete_churn':  # remove a live key, then put a new one, keeping the size constant
+        # the new key takes the removed key's place in live, so the skew keeps choosing by rank among live keys
+        live = list(half)
+        ranks = range(len(live))
+        live_weights = weights[:len(live)] if distribution == 'skewed' else None
+        ops = []
+        for added in (key + '~' for key in keys[:count // 2]):
+            if distribution == 'skewed':
+                index = rng.choices(ranks, cum_weights=live_weights)[0]
+            else:
+                index = rng.randrange(len(live))
+            ops.append(('remove', live[index]))
+            ops.append(('put', added))
+            live[index] = added
+        return half, None, ops
+    if workload == 'resize_heavy':  # grow from the default capacity, resizing many times
+        return [], None, [('put', key) for key in keys]
+    raise ValueError(f"unknown workload {workload}")
+
+
+def _new_map(module, function, presize, load, options):
+    """Return a map for a workload, built with options, resized and loaded as workload_ops asked."""
+    m = module.HashMap(11, function, **options)
+    if presize:
+        m.resize_table(presize)
+    for i, key in enumerate(load):
+        m.put(key, i)
+    return m
+
+
+def run_workload(module, function, workload: str, distribution: str, count: int,
+                 measure_memory: bool = True, options: dict = None) -> dict:
+    """
+    Run one workload against one map and hash function.
+    :param options: extra keyword arguments for the HashMap constructor, recorded in the result
+    :return: dictionary with ops/second, per-op latency percentiles in microseconds and,
+             if measure_memory, the peak memory in bytes of a second, traced run
+    """
+    keys = workload_keys(distribution, count)
+    load, presize, ops = workload_ops(workload, distribution, keys)
+    options = options or {}
+
+    m = _new_map(module, function, presize, load, options)
+    clock = time.perf_counter
+    latencies = []
+    gc.disable()  # keep garbage collector pauses out of the measurements, as timeit does
+    try:
+        for i, (op, key) in enumerate(ops):
+            if op == 'put':
+                start = clock()
+                m.put(key, i)
+            elif op == 'get':
+                start = clock()
+                m.get(key)
+            else:
+                start = clock()
+                m.remove(key)
+            latencies.append(clock() - start)
+    finally:
+        gc.enable()
+    latencies.sort()
+
+    def percentile(fraction):
+        return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)] * 1e6
+
+    result = {
+        'map': module.__name__,
+        'options': options,
+        'function': function.__name__,
+        'workload': workload,
+        'distribution': distribution,
+        'size': count,
+        'ops': len(ops),
+        'seconds': sum(latencies),
+        'ops_per_sec': len(ops) / sum(latencies) if latencies else 0.0,
+        'latency_us': {'p50': percentile(0.5), 'p90': percentile(0.9), 'p99': percentile(0.99),
+                       'p999': percentile(0.999), 'max': latencies[-1] * 1e6 if latencies else 0.0},
+        'final_size': m.get_size(),
+        'final_capacity': m.get_capacity(),
+    }
+
+    if measure_memory:
+        del m
+        tracemalloc.start()
+        m = _new_map(module, function, presize, load, options)
+        for i, (op, key) in enumerate(ops):
+            if op == 'put':
+                m.put(key, i)
+            elif op == 'get':
+                m.get(key)
+            else:
+                m.remove(key)
+        result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def run_suite(sizes=(10 ** 3, 10 ** 4), maps=('sc', 'oa'), functions=('hash_function_1', 'hash_function_2'),
+              workloads=WORKLOADS, distributions=DISTRIBUTIONS, measure_memory: bool = True,
+              probes=('quadratic',), progress=None) -> dict:
+    """
+    Run every combination of the given sizes, maps, hash functions, workloads and key distributions.
+    The 'oa' map is run once per probe strategy in probes.
+    :param progress: optional file to report each finished run to
+    :return: JSON-serializable dictionary with run metadata and a list of results
+    """
+    results = []
+    for size, map_name, function_name, workload, distribution in itertools.product(
+            sizes, maps, functions, workloads, distributions):
+        variants = [{'probe': probe} for probe in probes] if map_name == 'oa' else [{}]
+        for options in variants:
+            result = run_workload(MAPS[map_name], HASH_FUNCTIONS[function_name], workload, distribution, size,
+                                  measure_memory, options)
+            results.append(result)
+            if progress:
+                label = ' '.join([map_name] + [str(value) for value in options.values()])
+                print(f"{label} {function_name} {workload} {distribution} {size}: "
+                      f"{result['ops_per_sec']:,.0f} ops/s", file=progress)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'measure_memory': measure_memory,
+        },
+        'results': results,
+    }
+
+
+# (map, constructor options) pairs for the load factor and growth sweep; the quadratic OA settings stay
+# at or below 0.5, and linear and double hashing lower tombstone_ratio to leave empty slots at 0.9
+LOAD_SWEEP = (
+    [('sc', {'max_load': load}) for load in (0.5, 0.75, 1.0, 2.0, 4.0)]
+    + [('sc', {'growth_factor': factor}) for factor in (1.5, 3.0)]
+    + [('oa', {'probe': 'quadratic', 'max_load': load}) for load in (0.25, 0.4, 0.5)]
+    + [('oa', {'probe': probe, 'max_load': load, 'tombstone_ratio': 0.1})
+       for probe in ('linear', 'double') for load in (0.5, 0.7, 0.9)]
+    + [('oa', {'growth_factor': factor}) for factor in (1.5, 3.0)]
+)
+
+
+def bench_load_sweep(count: int = 10 ** 4, function=hash_function_fnv1a, settings=LOAD_SWEEP) -> None:
+    """
+    Print throughput and memory per entry for each map and constructor options in settings: puts while
+    growing from the default capacity (resize_heavy), lookups with 10% misses (get_heavy), the mixed
+    workload, and bytes per entry with count entries.
+    :param count: number of keys
+    :param function: hash function for the maps
+    :param settings: (map, options) pairs
+    :return: none
+    """
+    print(f"{'map':<4}{'options':<46}{'grow ops/s':>12}{'get ops/s':>12}{'mixed ops/s':>13}"
+          f"{'bytes/entry':>13}{'capacity':>10}")
+    for map_name, options in settings:
+        module = MAPS[map_name]
+        grow = run_workload(module, function, 'resize_heavy', 'random', count, False, options)
+        get = run_workload(module, function, 'get_heavy', 'random', count, False, options)
+        mixed = run_workload(module, function, 'mixed', 'random', count, False, options)
+        memory = bytes_per_entry(module, count, function, **options)
+        label = ' '.join(f"{key}={value}" for key, value in options.items())
+        print(f"{map_name:<4}{label:<46}{grow['ops_per_sec']:>12,.0f}{get['ops_per_sec']:>12,.0f}"
+              f"{mixed['ops_per_sec']:>13,.0f}{memory:>13.1f}{grow['final_capacity']:>10}")
+
+
+def bench_find_mode_scaling(count: int = 10 ** 6, distinct: int = 10 ** 4, workers=(1, 2, 4, 8)) -> None:
+    """
+    Time find_mode and find_mode_parallel with each number of worker processes on the same array,
+    and check that every parallel result is the same as the sequential one.
+    :param count: number of elements in the array
+    :param distinct: number of distinct keys among them
+    :param workers: numbers of worker processes
+    :return: none
+    """
+    rng = random.Random(0)
+    population = random_keys(distinct)
+    da = DynamicArray(rng.choices(population, k=count))
+    print(f"{count:,} elements, {distinct:,} distinct keys, {os.cpu_count()} CPUs")
+
+    start = time.perf_counter()
+    expected = hash_map_sc.find_mode(da)
+    sequential = time.perf_counter() - start
+    print(f"{'workers':<10}{'seconds':>10}{'speedup':>10}  same result")
+    print(f"{'find_mode':<10}{sequential:>10.3f}{1:>10.2f}")
+    for count_workers in workers:
+        start = time.perf_counter()
+        result = hash_map_sc.find_mode_parallel(da, count_workers)
+        elapsed = time.perf_counter() - start
+        same = result[1] == expected[1] and result[0].get_slice() == expected[0].get_slice()
+        print(f"{count_workers:<10}{elapsed:>10.3f}{sequential / elapsed:>10.2f}  {same}")
+
+
+def bench_persistence(count: int = 10 ** 5, lookups: int = 10 ** 4, function=hash_function_fnv1a) -> None:
+    """
+    Compare the ways to get a map of count entries back after a restart: building it again with put,
+    load() from a dump() file, and opening the file as a MappedHashMap, then time lookups in each.
+    :param count: number of entries
+    :param lookups: number of get calls timed per map
+    :param function: hash function for the maps
+    :return: none
+    """
+    keys = random_keys(count)
+    probes = random.Random(0).choices(keys, k=lookups)
+    print(f"{'map':<4}{'source':<10}{'ready ms':>10}{'get us':>9}{'file MB':>9}")
+    for module, name in ((hash_map_sc, 'sc'), (hash_map_oa, 'oa')):
+        with tempfile.TemporaryDirectory() as directory:
+            path = directory + '/map.bin'
+            start = time.perf_counter()
+            m = module.HashMap(11, function)
+            for i, key in enumerate(keys):
+                m.put(key, i)
+            built = time.perf_counter() - start
+            m.dump(path)
+            size = os.path.getsize(path) / 1e6
+
+            start = time.perf_counter()
+            loaded = module.HashMap.load(path, function)
+            load_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            mapped = hash_map_io.MappedHashMap(path, function)
+            map_seconds = time.perf_counter() - start
+
+            for source, target, seconds in (('put', m, built), ('load', loaded, load_seconds),
+                                            ('mmap', mapped, map_seconds)):
+                start = time.perf_counter()
+                for key in probes:
+                    target.get(key)
+                per_get = (time.perf_counter() - start) / lookups
+                print(f"{name:<4}{source:<10}{seconds * 1e3:>10.1f}{per_get * 1e6:>9.2f}{size:>9.1f}")
+            mapped.close()
+
+
+def bench_frozen(count: int = 10 ** 5, lookups: int = 10 ** 5, function=hash_function_fnv1a) -> None:
+    """
+    Compare a FrozenHashMap with the SC and OA maps it is frozen from: time to build (slowed down by
+    tracemalloc), lookup throughput for hits and for misses, and bytes per entry measured with tracemalloc.
+    :param count: number of entries
+    :param lookups: number of get calls timed for hits and for misses
+    :param function: hash function for all three maps
+    :return: none
+    """
+    # the frozen map needs distinct hashes, so keep one key per hash: the weak functions give fewer keys
+    distinct = {}
+    for key in random_keys(count):
+        distinct.setdefault(function(key), key)
+    keys = list(distinct.values())
+    count = len(keys)
+    pairs = DynamicArray([(key, i) for i, key in enumerate(keys)])
+    rng = random.Random(0)
+    hits = rng.choices(keys, k=lookups)
+    misses = [key + '#' for key in rng.choices(keys, k=lookups)]
+
+    builders = (
+        ('sc', lambda: _filled(hash_map_sc.HashMap(11, function), keys)),
+        ('oa', lambda: _filled(hash_map_oa.HashMap(11, function), keys)),
+        ('frozen', lambda: hash_map_frozen.FrozenHashMap(pairs, function)),
+    )
+    print(f"{count:,} keys with distinct hashes")
+    print(f"{'map':<8}{'build ms':>10}{'hit gets/s':>13}{'miss gets/s':>13}{'bytes/entry':>13}")
+    for name, build in builders:
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        m = build()
+        built = time.perf_counter() - start
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        rates = []
+        for probes in (hits, misses):
+            get = m.get
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                for key in probes:
+                    get(key)
+                rates.append(len(probes) / (time.perf_counter() - start))
+            finally:
+                gc.enable()
+        print(f"{name:<8}{built * 1e3:>10.0f}{rates[0]:>13,.0f}{rates[1]:>13,.0f}{used / count:>13.1f}")
+        del m
+
+
+def _filled(m, keys: list):
+    """Put every key into the map, with its index as the value, and return the map."""
+    for i, key in enumerate(keys):
+        m.put(key, i)
+    return m
+
+
+def main(argv=None) -> None:
+    """Command line entry point, see the comment at the top of this file."""
+    parser = argparse.ArgumentParser(description='Benchmarks for the SC and OA HashMap implementations.')
+    commands = parser.add_subparsers(dest='command')
+
+    suite = commands.add_parser('suite', help='workload suite, emitted as JSON')
+    suite.add_argument('--sizes', type=int, nargs='+', default=[10 ** 3, 10 ** 4])
+    suite.add_argument('--maps', nargs='+', choices=sorted(MAPS), default=['sc', 'oa'])
+    suite.add_argument('--functions', nargs='+', choices=sorted(HASH_FUNCTIONS),
+                       default=['hash_function_1', 'hash_function_2'])
+    suite.add_argument('--workloads', nargs='+', choices=WORKLOADS, default=list(WORKLOADS))
+    suite.add_argument('--distributions', nargs='+', choices=DISTRIBUTIONS, default=list(DISTRIBUTIONS))
+    suite.add_argument('--probes', nargs='+', choices=hash_map_oa.PROBE_STRATEGIES, default=['quadratic'],
+                       help='probe strategies to run the oa map with')
+    suite.add_argument('--no-memory', action='store_true', help='skip the traced run for peak memory')
+    suite.add_argument('--output', help='write the JSON here instead of standard output')
+
+    latency = commands.add_parser('latency', help='worst-case put latency, stop-the-world vs incremental')
+    latency.add_argument('--sizes', type=int, nargs='+', default=[10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6])
+
+    memory = commands.add_parser('memory', help='bytes per stored entry, measured with tracemalloc')
+    memory.add_argument('--sizes', type=int, nargs='+', default=[10 ** 4, 10 ** 5])
+
+    hashes = commands.add_parser('hashes', help='hash function throughput and distribution')
+    hashes.add_argument('--count', type=int, default=100000)
+
+    capacity = commands.add_parser('capacity', help='prime vs power-of-two capacities, per op and per resize')
+    capacity.add_argument('--sizes', type=int, nargs='+', default=[10 ** 4, 10 ** 5])
+    capacity.add_argument('--function', choices=sorted(HASH_FUNCTIONS), default='builtin')
+
+    sweep = commands.add_parser('sweep', help='throughput and bytes per entry across load factors and growth')
+    sweep.add_argument('--count', type=int, default=10 ** 4)
+    sweep.add_argument('--function', choices=sorted(HASH_FUNCTIONS), default='fnv1a')
+
+    modes = commands.add_parser('modes', help='find_mode against find_mode_parallel with 1 to N workers')
+    modes.add_argument('--count', type=int, default=10 ** 6)
+    modes.add_argument('--distinct', type=int, default=10 ** 4)
+    modes.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+
+    persist = commands.add_parser('persist', help='rebuild with put against load() and MappedHashMap')
+    persist.add_argument('--count', type=int, default=10 ** 5)
+
+    frozen = commands.add_parser('frozen', help='FrozenHashMap against the SC and OA maps')
+    frozen.add_argument('--count', type=int, default=10 ** 5)
+    frozen.add_argument('--function', choices=sorted(HASH_FUNCTIONS), default='fnv1a')
+
+    args = parser.parse_args(argv)
+    if args.command == 'suite':
+        report = run_suite(args.sizes, args.maps, args.functions, args.workloads, args.distributions,
+                           not args.no_memory, args.probes, progress=sys.stderr)
+        if args.output:
+            with open(args.output, 'w') as file:
+                json.dump(report, file, indent=2)
+        else:
+            json.dump(report, sys.stdout, indent=2)
+            print()
+    elif args.command == 'latency':
+        bench_put_latency(args.sizes)
+    elif args.command == 'memory':
+        bench_memory(args.sizes)
+    elif args.command == 'hashes':
+        bench_hash_functions(args.count)
+    elif args.command == 'capacity':
+        bench_capacity_modes(args.sizes, HASH_FUNCTIONS[args.function])
+    elif args.command == 'sweep':
+        bench_load_sweep(args.count, HASH_FUNCTIONS[args.function])
+    elif args.command == 'modes':
+        bench_find_mode_scaling(args.count, args.distinct, args.workers)
+    elif args.command == 'persist':
+        bench_persistence(args.count)
+    elif args.command == 'frozen':
+        bench_frozen(args.count, function=HASH_FUNCTIONS[args.function])
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
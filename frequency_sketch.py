@@ -0,0 +1,269 @@
+# Course: CS261 - Data Structures
+# Assignment: 6 - HashMap
+# Description: Approximate frequency counting in a fixed amount of memory, for streams with too many distinct
+# keys to give each one a counter as find_mode does. MisraGries keeps a bounded number of counters in a
+# separate chaining HashMap and finds the heavy hitters; CountMinSketch keeps a fixed grid of counters and
+# estimates the frequency of any key. Both report how far their answers can be from the exact counts.
+
+import math
+from array import array
+from operator import itemgetter
+
+from a6_include import DynamicArray, GOLDEN_64, MASK_64, iter_elements, mix_hash, hash_function_fnv1a
+from hash_map_sc import HashMap
+
+_ROW_SEED = GOLDEN_64  # mixed into the hash to derive the second row hash of CountMinSketch
+
+
+class MisraGries:
+    def __init__(self, counters: int, function=hash_function_fnv1a) -> None:
+        """
+        Initialize a Misra-Gries summary that keeps at most the given number of counters.
+        An estimate is never above the exact count, and never below it by more than error_bound(),
+        which is at most (number of keys added) / (counters + 1). So every key that makes up more than
+        1 / (counters + 1) of the stream is among the counted keys.
+        :param counters: maximum number of keys counted at once
+        :param function: hash function for the HashMap of counters
+        """
+        if counters < 1:
+            raise ValueError("counters must be at least 1")
+        self._limit = counters
+        self._counts = HashMap(counters + 1, function)  # never resizes: it holds at most counters + 1 keys
+        self._total = 0
+        self._decrements = 0
+
+    @classmethod
+    def from_error(cls, epsilon: float, function=hash_function_fnv1a) -> "MisraGries":
+        """
+        Return a summary whose estimates are at most epsilon * (number of keys added) below the exact counts.
+        :param epsilon: relative error, greater than 0 and less than 1
+        :param function: hash function for the HashMap of counters
+        """
+        if not 0 < epsilon < 1:
+            raise ValueError("epsilon must be greater than 0 and less than 1")
+        return cls(math.ceil(1 / epsilon) - 1 or 1, function)
+
+    def add(self, key: str) -> None:
+        """
+        Count one occurrence of the key.
+        :param key: string to count
+        :return: none
+        """
+        self._total += 1
+        counts = self._counts
+        if counts.increment(key) == 1 and counts.get_size() > self._limit:
+            # no counter was free for the new key: decrement every counter, the new one included,
+            # and drop the ones that reach zero
+            self._decrements += 1
+            pairs = counts.get_keys_and_values()
+            for i in range(pairs.length()):
+                key, count = pairs.get_unchecked(i)
+                if count == 1:
+                    counts.remove(key)
+                else:
+                    counts.put(key, count - 1)
+
+    def add_many(self, keys) -> None:
+        """
+        Count one occurrence of every key in keys.
+        :param keys: dynamic array, iterable or generator of keys
+        :return: none
+        """
+        add = self.add
+        for key in iter_elements(keys):
+            add(key)
+
+    def estimate(self, key: str) -> int:
+        """
+        Return a lower bound of the number of times the key was added: the exact count is at least
+        this and at most this plus error_bound().
+        :param key: string to look up
+        :return: estimated count
+        """
+        return self._counts.get(key) or 0
+
+    def error_bound(self) -> int:
+        """
+        Return how far below its exact count any estimate can be.
+        :return: number of times the counters were decremented
+        """
+        return self._decrements
+
+    def get_total(self) -> int:
+        """
+        Return the number of keys added.
+        """
+        return self._total
+
+    def heavy_hitters(self, threshold: float) -> DynamicArray:
+        """
+        Return every key that may make up at least threshold of the keys added. Every key that does is
+        included as long as threshold is above 1 / (counters + 1), and so may be keys that fall short
+        by up to error_bound().
+        :param threshold: fraction of the keys added, greater than 0 and at most 1
+        :return: dynamic array of (key, estimated count) tuples, highest estimate first
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be greater than 0 and at most 1")
+        minimum = threshold * self._total - self._decrements
+        pairs = self._counts.get_keys_and_values().get_slice()
+        return DynamicArray(sorted((pair for pair in pairs if pair[1] >= minimum), key=itemgetter(1), reverse=True))
+
+
+class CountMinSketch:
+    def __init__(self, width: int, depth: int, function=hash_function_fnv1a) -> None:
+        """
+        Initialize a Count-Min Sketch of depth rows of width counters.
+        An estimate is never below the exact count, and with probability at least 1 - e^-depth it is
+        above it by at most e / width * (number of keys added), see error_bound(). Keys are hashed once
+        with function, and each row indexes with its own combination of two mixes of that hash, so keys
+        that collide in function collide in every row: use a well spread 64-bit hash.
+        :param width: counters per row
+        :param depth: number of rows
+        :param function: hash function for the keys
+        """
+        if width < 1 or depth < 1:
+            raise ValueError("width and depth must be at least 1")
+        self._width = width
+        self._depth = depth
+        self._hash_function = function
+        self._counts = array('Q', bytes(8 * width * depth))  # row after row
+        self._total = 0
+
+    @classmethod
+    def from_error(cls, epsilon: float, delta: float, function=hash_function_fnv1a) -> "CountMinSketch":
+        """
+        Return a sketch whose estimates are, with probability at least 1 - delta, at most
+        epsilon * (number of keys added) above the exact counts.
+        :param epsilon: relative error, greater than 0
+        :param delta: probability of a larger error, greater than 0 and less than 1
+        :param function: hash function for the keys
+        """
+        if not epsilon > 0 or not 0 < delta < 1:
+            raise ValueError("epsilon must be greater than 0 and delta between 0 and 1")
+        return cls(math.ceil(math.e / epsilon), math.ceil(math.log(1 / delta)), function)
+
+    @classmethod
+    def from_budget(cls, budget: int, depth: int = 4, function=hash_function_fnv1a) -> "CountMinSketch":
+        """
+        Return the widest sketch of the given depth whose counters fit in budget bytes.
+        :param budget: memory for the counters, in bytes
+        :param depth: number of rows
+        :param function: hash function for the keys
+        """
+        return cls(max(budget // (8 * depth), 1), depth, function)
+
+    def _indices(self, key: str):
+        """
+        Yield the index of the key's counter in each row.
+        """
+        hash = self._hash_function(key)
+        first = mix_hash(hash)
+        second = mix_hash(hash ^ _ROW_SEED) | 1
+        width = self._width
+        for row in range(self._depth):
+            yield row * width + ((first + row * second) & MASK_64) % width
+
+    def add(self, key: str, count: int = 1) -> None:
+        """
+        Count count occurrences of the key.
+        :param key: string to count
+        :param count: number of occurrences, at least 0
+        :return: none
+        """
+        if count < 0:
+            raise ValueError("count must be at least 0")
+        counts = self._counts
+        for index in self._indices(key):
+            counts[index] += count
+        self._total += count
+
+    def add_many(self, keys) -> None:
+        """
+        Count one occurrence of every key in keys.
+        :param keys: dynamic array, iterable or generator of keys
+        :return: none
+        """
+        add = self.add
+        for key in iter_elements(keys):
+            add(key)
+
+    def estimate(self, key: str) -> int:
+        """
+        Return an upper bound of the number of times the key was added: the exact count is at most this,
+        and with the probability given by error_bound() at least this minus the bound.
+        :param key: string to look up
+        :return: estimated count
+        """
+        counts = self._counts
+        return min(counts[index] for index in self._indices(key))
+
+    def error_bound(self) -> (float, float):
+        """
+        Return how far above its exact count an estimate can be, and the probability that it is not further.
+        :return: tuple of e / width * (number of keys added) and 1 - e^-depth
+        """
+        return math.e / self._width * self._total, 1 - math.exp(-self._depth)
+
+    def get_total(self) -> int:
+        """
+        Return the number of keys added.
+        """
+        return self._total
+
+    def memory_bytes(self) -> int:
+        """
+        Return the memory taken by the counters, in bytes.
+        """
+        return self._counts.itemsize * len(self._counts)
+
+
+def find_mode_approximate(keys, counters: int = 1000) -> (DynamicArray, int, int):
+    """
+    Return the likely mode/s of keys, counted in one pass with a Misra-Gries summary of the given number of
+    counters instead of one counter per distinct key. If the exact mode makes up more than 1 / (counters + 1)
+    of the keys, it is among the returned keys.
+    :param keys: dynamic array, iterable or generator of keys
+    :param counters: memory budget, as a number of counters
+    :return: tuple of a dynamic array with the key/s of the highest estimated count, that estimate, and how far
+             below the exact counts the estimates can be
+    """
+    summary = MisraGries(counters)
+    summary.add_many(keys)
+    mode_array = DynamicArray()
+    max_frequency = 0
+    pairs = summary._counts.get_keys_and_values()
+    for i in range(pairs.length()):
+        key, count = pairs.get_unchecked(i)
+        if count > max_frequency:
+            max_frequency = count
+            mode_array = DynamicArray()
+        if count == max_frequency:
+            mode_array.append(key)
+    return mode_array, max_frequency, summary.error_bound()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nMisraGries heavy hitters")
+    print("------------------------")
+    stream = ['a'] * 500 + ['b'] * 300 + ['c'] * 120 + ['key' + str(i) for i in range(1080)]
+    summary = MisraGries(9)
+    summary.add_many(stream)
+    print(summary.get_total(), summary.error_bound(), summary.heavy_hitters(0.1).get_slice())
+    print(summary.estimate('a'), summary.estimate('b'), summary.estimate('c'), summary.estimate('key0'))
+
+    print("\nCountMinSketch estimates")
+    print("------------------------")
+    sketch = CountMinSketch.from_error(0.01, 0.01)
+    sketch.add_many(stream)
+    print(sketch.memory_bytes(), [round(bound, 3) for bound in sketch.error_bound()])
+    print(sketch.estimate('a'), sketch.estimate('b'), sketch.estimate('c'), sketch.estimate('key0'))
+
+    print("\nfind_mode_approximate")
+    print("---------------------")
+    da = DynamicArray(['apple', 'pear', 'apple', 'fig', 'pear', 'apple', 'kiwi', 'plum'])
+    mode, frequency, error = find_mode_approximate(da, counters=3)
+    print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}, Error: {error}")
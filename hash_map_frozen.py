@@ -0,0 +1,247 @@
+# Course: CS261 - Data Structures
+# Assignment: 6 - HashMap
+# Description: Immutable HashMap built around a minimal perfect hash function, for maps that are built once
+# and then only read. Keys are hashed into small buckets, and each bucket gets a displacement (CHD, "hash
+# and displace") that moves its keys to slots no other key uses, so the n keys fill exactly n slots and a
+# lookup reads one displacement and compares one key: no chains, probe sequences or empty slots.
+# Built with FrozenHashMap(pairs) or with the freeze() method of the SC and OA HashMaps.
+
+import math
+from array import array
+
+from a6_include import (DynamicArray, HashEntry, MapViews, GOLDEN_64, MASK_64, as_list, mix_hash, hash_function_2,
+                        hash_function_fnv1a)
+
+_MAX_DISPLACEMENT = 1 << 16  # displacements tried for one bucket before the build starts over with another seed
+_MAX_SEEDS = 16
+
+
+def _position(hash: int, offset: int, size: int) -> int:
+    """
+    Return the slot of a key with the given (mixed) hash in a bucket with the given displacement offset.
+    The product folds every bit of hash ^ offset into the low bits, so two keys that share a slot under one
+    displacement are unlikely to share one under the next, whatever the size.
+    """
+    product = ((hash ^ offset) * GOLDEN_64) & MASK_64
+    return (product ^ (product >> 29)) % size
+
+
+class FrozenHashMap(MapViews):
+    def __init__(self, pairs, function=hash_function_fnv1a, *, bucket_size: float = 2.0, seed: int = 0) -> None:
+        """
+        Build an immutable hash map of the given key/value pairs.
+        No two keys may have the same full hash, since nothing could then give them different slots, so the
+        default is the well spread 64-bit hash_function_fnv1a rather than the hash function of the map the
+        pairs come from (hash_function_1 gives every anagram the same hash, for example). The seed is mixed
+        into the hashes, and if no displacement fits some bucket the next seed is tried. A larger
+        bucket_size needs fewer displacements, so less memory, but takes longer to build.
+        :param pairs: dynamic array or iterable of (key, value) tuples with distinct keys
+        :param function: hash function for the keys
+        :param bucket_size: average number of keys per displacement bucket
+        :param seed: seed of the first attempt
+        """
+        if not bucket_size > 0:
+            raise ValueError("bucket_size must be greater than 0")
+        items = as_list(pairs)
+        keys = [key for key, _ in items]
+        if len(set(keys)) != len(keys):
+            raise ValueError("keys must be distinct")
+        hashes = [function(key) & MASK_64 for key in keys]
+        if len(set(hashes)) != len(hashes):
+            raise ValueError("some keys have the same hash, use a better spread hash function")
+
+        self._hash_function = function
+        self._size = len(keys)
+        self._buckets = max(1, math.ceil(self._size / bucket_size))
+        for seed in range(seed, seed + _MAX_SEEDS):
+            if self._build(items, hashes, seed):
+                return
+        raise ValueError(f"no perfect hash found for these keys with seeds up to {seed}")
+
+    def _build(self, items: list, hashes: list, seed: int) -> bool:
+        """
+        Try to find a displacement for every bucket, with the hashes scrambled by the given seed.
+        :param items: list of (key, value) tuples
+        :param hashes: hash of each key
+        :param seed: seed to mix into the hashes
+        :return: True if the map was built, False if some bucket could not be placed
+        """
+        scramble = mix_hash(seed)
+        size = self._size
+        count = self._buckets
+        # mixed so every bit depends on the whole hash: the shipped hash functions give small values that
+        # differ in a few low bits, which would leave the high bits to the seed and most slots unreachable
+        hashes = [mix_hash(hash ^ scramble) for hash in hashes]
+        buckets = [[] for _ in range(count)]
+        for i, hash in enumerate(hashes):
+            buckets[(hash >> 32) % count].append(i)  # the bucket from the high bits, the slot from all of them
+
+        displacements = array('i' if size < 1 << 31 else 'q', [0]) * count
+        offsets = []  # the value each displacement XORs into the hash, mix_hash(displacement)
+        slots = [0] * size
+        taken = bytearray(size)
+        singles = []
+
+        # largest buckets first, while most slots are still free
+        for bucket in sorted(range(count), key=lambda b: len(buckets[b]), reverse=True):
+            members = buckets[bucket]
+            if len(members) < 2:
+                if members:
+                    singles.append(bucket)
+                continue
+            for displacement in range(_MAX_DISPLACEMENT):
+                if displacement == len(offsets):
+                    offsets.append(mix_hash(displacement))
+                offset = offsets[displacement]
+                positions = [_position(hashes[i], offset, size) for i in members]
+                if len(set(positions)) == len(positions) and not any(taken[p] for p in positions):
+                    break
+            else:
+                return False
+            for i, position in zip(members, positions):
+                taken[position] = 1
+                slots[i] = position
+            displacements[bucket] = displacement
+
+        # a bucket with one key does not need a shared displacement: it stores the free slot it gets,
+        # as -(slot + 1) so it cannot be mistaken for a displacement
+        free = (position for position in range(size) if not taken[position])
+        for bucket in singles:
+            position = next(free)
+            slots[buckets[bucket][0]] = position
+            displacements[bucket] = -position - 1
+
+        self._scramble = scramble
+        self._seed = seed
+        self._displacements = displacements
+        self._offsets = offsets
+        self._keys = [None] * size
+        self._values = [None] * size
+        for (key, value), position in zip(items, slots):
+            self._keys[position] = key
+            self._values[position] = value
+        return True
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map, which is always its size
+        """
+        return self._size
+
+    def table_load(self) -> float:
+        """
+        Returns the hash table load factor, 1.0 for any map with keys.
+        """
+        return 1.0 if self._size else 0.0
+
+    def _slot(self, key: str) -> int:
+        """
+        Return the only slot the key can be in.
+        :param key: string to search for
+        """
+        hash = (self._hash_function(key) & MASK_64) ^ self._scramble  # mix_hash inlined, this runs on every lookup
+        hash ^= hash >> 33
+        hash = (hash * 0xFF51AFD7ED558CCD) & MASK_64
+        hash ^= hash >> 33
+        hash = (hash * 0xC4CEB9FE1A85EC53) & MASK_64
+        hash ^= hash >> 33
+        displacement = self._displacements[(hash >> 32) % self._buckets]
+        if displacement < 0:
+            return -displacement - 1
+        return _position(hash, self._offsets[displacement], self._size)
+
+    def get(self, key: str) -> object:
+        """
+        Return the value associated with the given key. If the key is not in the hash map, the method returns None.
+        :param key: string/key associated with value
+        :return: string/key associated with value or none
+        """
+        if self._size:
+            slot = self._slot(key)
+            if self._keys[slot] == key:
+                return self._values[slot]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Return True if the given key is in the hash map, otherwise it returns False.
+        :param key: string to search for in the hash map
+        :return: True or False
+        """
+        return self._size > 0 and self._keys[self._slot(key)] == key
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Look up every key in keys.
+        :param keys: DynamicArray or iterable of keys
+        :return: dynamic array of the associated values, None for keys that are not in the map
+        """
+        result = DynamicArray()
+        for key in as_list(keys):
+            result.append(self.get(key))
+        return result
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Return a dynamic array where each index contains a tuple of a key/value pair
+        stored in the hash map.
+        :return: dynamic array consisting of key/value pairs
+        """
+        return DynamicArray(list(zip(self._keys, self._values)))
+
+    def stats(self) -> dict:
+        """
+        Return the shape of the perfect hash.
+        :return: dictionary with the size, number of displacement buckets, the seed of the hash function
+                 that worked, the largest displacement used and the memory of the displacements per key
+        """
+        displacements = self._displacements
+        return {
+            'size': self._size,
+            'buckets': self._buckets,
+            'seed': self._seed,
+            'max_displacement': len(self._offsets) - 1,
+            'displacement_bytes_per_key': displacements.itemsize * len(displacements) / max(self._size, 1),
+        }
+
+    def __iter__(self):
+        """
+        Iterate over the entries of the hash map, in slot order, as HashEntry objects.
+        Entries are created on the fly, so changing them does not change the map.
+        """
+        for key, value in zip(self._keys, self._values):
+            yield HashEntry(key, value)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nget and contains_key")
+    print("--------------------")
+    m = FrozenHashMap([('str' + str(i), i * 100) for i in range(150)])
+    print(m.get_size(), m.get_capacity(), m.table_load())
+    print(m.get('str7'), m.contains_key('str7'), m.get('str150'), m.contains_key('str150'))
+
+    print("\nanagrams, which hash_function_1 cannot tell apart")
+    print("--------------------------------------------------")
+    m = FrozenHashMap([('abc', 1), ('bca', 2), ('cab', 3), ('acb', 4)])
+    print(m.get('abc'), m.get('bca'), m.get('cab'), m.get('acb'), m.get('bac'))
+    print(sorted(m.items()))
+
+    print("\nhash_function_2, whose small hashes differ only in their low bits")
+    print("-----------------------------------------------------------------")
+    pairs = {}
+    for i in range(300):
+        pairs.setdefault(hash_function_2('str' + str(i)), ('str' + str(i), i))  # one key per hash
+    m = FrozenHashMap(list(pairs.values()), hash_function_2)
+    print(m.get_size(), m.stats()['seed'], all(m.get(key) == value for key, value in pairs.values()))
+    try:
+        FrozenHashMap([('str' + str(i), i) for i in range(300)], hash_function_2)
+    except ValueError as error:
+        print(error)
@@ -0,0 +1,452 @@
+# Course: CS261 - Data Structures
+# Assignment: 6 - HashMap
+# Description: Compact binary file format for saving the SC and OA HashMaps, used by their dump() and load()
+# methods, and MappedHashMap, which answers get and contains_key straight from a memory-mapped file.
+# The file keeps every entry's cached hash and slot, so loading places the entries back without calling
+# the hash function or probing, and the entries are grouped by home bucket (hash % capacity) behind an
+# offset table, so a mapped lookup reads one bucket's worth of hashes and decodes only the matching entry.
+#
+# Layout, every section starting on an 8-byte boundary, integers in the byte order named in the header:
+#   header                 see _HEADER
+#   bucket offsets         capacity + 1 unsigned 64-bit: entries of home bucket b are [offsets[b], offsets[b + 1])
+#   hashes                 size 64-bit cached hashes, signed or unsigned as the header says
+#   slots                  size unsigned 64-bit: index of the entry's bucket (SC) or slot (OA) in the map
+#   record offsets         size + 1 unsigned 64-bit offsets into the records
+#   records                per entry: 32-bit key length, UTF-8 key, one byte value tag, encoded value
+
+import mmap
+import pickle
+import struct
+import sys
+from array import array
+
+from a6_include import MASK_64, finalized
+
+MAGIC = b'A6HM'
+VERSION = 2
+KINDS = ('sc', 'oa')
+
+# magic, version, kind, power_of_two, probe strategy index, hash typecode, big endian,
+# capacity, size, hash function fingerprint, max_load, growth_factor, tombstone_ratio (0 for SC),
+# shrink_load (0 if not set), min_capacity
+_HEADER = struct.Struct('<4sHBBBcB5xQQQddddQ')
+
+_FINGERPRINT_KEY = 'hash_map_io fingerprint'  # hashed with the map's function to detect a different function
+
+# value tags
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _BYTES, _PICKLE = range(8)
+_INT64 = struct.Struct('<q')
+_FLOAT64 = struct.Struct('<d')
+_KEY_LENGTH = struct.Struct('<I')
+
+
+def fingerprint(function) -> int:
+    """
+    Return a 64-bit value that identifies the hash function, so a file is not read with a different one.
+    :param function: hash function of the map, finalized in power-of-two mode
+    :return: hash of a fixed key
+    """
+    return function(_FINGERPRINT_KEY) & MASK_64
+
+
+def _encode_value(value: object) -> bytes:
+    """
+    Return the tag byte and encoding of a value. None, booleans, 64-bit integers, floats, strings and bytes
+    have compact encodings, anything else is pickled.
+    """
+    if value is None:
+        return bytes((_NONE,))
+    if value is False:
+        return bytes((_FALSE,))
+    if value is True:
+        return bytes((_TRUE,))
+    kind = type(value)
+    if kind is int and -(1 << 63) <= value < 1 << 63:
+        return bytes((_INT,)) + _INT64.pack(value)
+    if kind is float:
+        return bytes((_FLOAT,)) + _FLOAT64.pack(value)
+    if kind is str:
+        return bytes((_STR,)) + value.encode()
+    if kind is bytes:
+        return bytes((_BYTES,)) + value
+    return bytes((_PICKLE,)) + pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+
+def _decode_value(data, start: int, end: int) -> object:
+    """
+    Decode the value whose tag byte is at data[start] and whose encoding ends at end.
+    """
+    tag = data[start]
+    if tag == _NONE:
+        return None
+    if tag == _FALSE:
+        return False
+    if tag == _TRUE:
+        return True
+    if tag == _INT:
+        return _INT64.unpack_from(data, start + 1)[0]
+    if tag == _FLOAT:
+        return _FLOAT64.unpack_from(data, start + 1)[0]
+    if tag == _STR:
+        return str(data[start + 1:end], 'utf-8')
+    if tag == _BYTES:
+        return bytes(data[start + 1:end])
+    if tag == _PICKLE:
+        return pickle.loads(data[start + 1:end])
+    raise ValueError(f"unknown value tag {tag}")
+
+
+def _pad(file, written: int) -> int:
+    """Write zero bytes up to the next 8-byte boundary and return the new number of bytes written."""
+    padding = -written % 8
+    file.write(bytes(padding))
+    return written + padding
+
+
+def write(path: str, kind: str, capacity: int, entries: list, *, function, power_of_two: bool = False,
+          probe: int = 0, max_load: float = 1.0, growth_factor: float = 2.0, tombstone_ratio: float = 0.0,
+          shrink_load: float = None, min_capacity: int = None) -> None:
+    """
+    Write a map's entries to path.
+    :param path: file to create or overwrite
+    :param kind: 'sc' or 'oa'
+    :param capacity: capacity of the map's table
+    :param entries: list of (slot, key, value, hash) tuples, in the order entries sharing a slot must keep
+    :param function: the map's hash function, for the fingerprint
+    :param power_of_two: capacity mode of the map
+    :param probe: index of the OA probe strategy
+    :param max_load: the map's max_load
+    :param growth_factor: the map's growth_factor
+    :param tombstone_ratio: the OA map's tombstone_ratio
+    :param shrink_load: the map's shrink_load, None if it does not shrink
+    :param min_capacity: the smallest capacity the map shrinks to, by default capacity
+    :return: none
+    """
+    size = len(entries)
+
+    # group the entries by home bucket with a stable counting sort, so a bucket's entries keep their order
+    offsets = array('Q', bytes(8 * (capacity + 1)))
+    homes = [hash % capacity for _, _, _, hash in entries]
+    for home in homes:
+        offsets[home + 1] += 1
+    for i in range(capacity):
+        offsets[i + 1] += offsets[i]
+    position = offsets[:-1]
+    order = [0] * size
+    for i, home in enumerate(homes):
+        order[position[home]] = i
+        position[home] += 1
+
+    hashes = [entries[i][3] for i in order]
+    typecode = 'q' if any(hash < 0 for hash in hashes) else 'Q'
+    hashes = array(typecode, hashes)
+    slots = array('Q', [entries[i][0] for i in order])
+    record_offsets = array('Q', bytes(8 * (size + 1)))
+    records = bytearray()
+    for n, i in enumerate(order):
+        key, value = entries[i][1], entries[i][2]
+        encoded = key.encode()
+        records += _KEY_LENGTH.pack(len(encoded))
+        records += encoded
+        records += _encode_value(value)
+        record_offsets[n + 1] = len(records)
+
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, KINDS.index(kind), power_of_two, probe, typecode.encode(),
+                                sys.byteorder == 'big', capacity, size, fingerprint(function),
+                                max_load, growth_factor, tombstone_ratio, shrink_load or 0.0,
+                                capacity if min_capacity is None else min_capacity))
+        written = _HEADER.size
+        for section in (offsets, hashes, slots, record_offsets):
+            section.tofile(file)
+            written = _pad(file, written + section.itemsize * len(section))
+        file.write(records)
+
+
+class _Sections:
+    """
+    The parsed header and array views of a map file, read from any buffer (bytes or an mmap).
+    """
+
+    def __init__(self, buffer, path: str) -> None:
+        """
+        Parse the header and locate the sections.
+        :param buffer: contents of the file
+        :param path: name of the file, for error messages
+        """
+        if len(buffer) < _HEADER.size:
+            raise ValueError(f"{path} is not a hash map file")
+        (magic, version, kind, power_of_two, probe, typecode, big_endian,
+         capacity, size, function_print, max_load, growth_factor, tombstone_ratio, shrink_load,
+         min_capacity) = _HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a hash map file")
+        if version != VERSION:
+            raise ValueError(f"{path} has format version {version}, expected {VERSION}")
+        self.kind = KINDS[kind]
+        self.power_of_two = bool(power_of_two)
+        self.probe = probe
+        self.capacity = capacity
+        self.size = size
+        self.fingerprint = function_print
+        self.max_load = max_load
+        self.growth_factor = growth_factor
+        self.tombstone_ratio = tombstone_ratio
+        self.shrink_load = shrink_load or None
+        self.min_capacity = min_capacity
+        self.swapped = bool(big_endian) != (sys.byteorder == 'big')
+
+        # a file cut short would otherwise fail with an IndexError in whichever lookup reaches past its end
+        records_start = _HEADER.size + 8 * (capacity + 1) + 16 * size + 8 * (size + 1)
+        if len(buffer) < records_start:
+            raise ValueError(f"{path} is a truncated map file")
+        records_length = struct.unpack_from('>Q' if big_endian else '<Q', buffer, records_start - 8)[0]
+        if len(buffer) < records_start + records_length:  # the last record offset is where the records end
+            raise ValueError(f"{path} is a truncated map file")
+
+        view = memoryview(buffer)
+        start = _HEADER.size
+        self.offsets = view[start:start + 8 * (capacity + 1)].cast('Q')
+        start += 8 * (capacity + 1)
+        self.hashes = view[start:start + 8 * size].cast(typecode.decode())
+        start += 8 * size
+        self.slots = view[start:start + 8 * size].cast('Q')
+        start += 8 * size
+        self.record_offsets = view[start:start + 8 * (size + 1)].cast('Q')
+        start += 8 * (size + 1)
+        self.records = view[start:]
+
+    def release(self) -> None:
+        """Release the views, so the buffer underneath can be closed."""
+        for view in (self.offsets, self.hashes, self.slots, self.record_offsets, self.records):
+            view.release()
+
+    def key(self, index: int) -> bytes:
+        """Return the UTF-8 key of the entry at index."""
+        start = self.record_offsets[index]
+        length = _KEY_LENGTH.unpack_from(self.records, start)[0]
+        return self.records[start + 4:start + 4 + length]
+
+    def value(self, index: int) -> object:
+        """Return the decoded value of the entry at index."""
+        start = self.record_offsets[index]
+        length = _KEY_LENGTH.unpack_from(self.records, start)[0]
+        return _decode_value(self.records, start + 4 + length, self.record_offsets[index + 1])
+
+
+def read(path: str, kind: str, function) -> (dict, list):
+    """
+    Read a map file written by write. Values without a compact encoding are unpickled, so only read
+    files from a trusted source: a crafted file can run arbitrary code.
+    :param path: file to read
+    :param kind: 'sc' or 'oa', the kind of map the file must hold
+    :param function: hash function the map will use, finalized in power-of-two mode, checked against the file
+    :return: tuple of the header fields as a dictionary and a list of (slot, key, value, hash) tuples,
+             in the order write was given them within each slot
+    """
+    with open(path, 'rb') as file:
+        buffer = file.read()
+    sections = _Sections(buffer, path)
+    try:
+        if sections.kind != kind:
+            raise ValueError(f"{path} holds a {sections.kind} map, not {kind}")
+        header = {
+            'capacity': sections.capacity,
+            'power_of_two': sections.power_of_two,
+            'probe': sections.probe,
+            'max_load': sections.max_load,
+            'growth_factor': sections.growth_factor,
+            'tombstone_ratio': sections.tombstone_ratio,
+            'shrink_load': sections.shrink_load,
+            'min_capacity': sections.min_capacity,
+        }
+        if sections.power_of_two:
+            function = finalized(function)
+        if fingerprint(function) != sections.fingerprint:
+            raise ValueError(f"{path} was written with a different hash function")
+
+        hashes, slots, record_offsets = sections.hashes, sections.slots, sections.record_offsets
+        if sections.swapped:  # written on a machine of the other byte order
+            hashes, slots, record_offsets = (array(view.format, view.tobytes()) for view in
+                                             (hashes, slots, record_offsets))
+            for section in (hashes, slots, record_offsets):
+                section.byteswap()
+            sections.record_offsets = record_offsets
+
+        records = sections.records
+        entries = []
+        for i in range(sections.size):
+            start = record_offsets[i]
+            length = _KEY_LENGTH.unpack_from(records, start)[0]
+            key = str(records[start + 4:start + 4 + length], 'utf-8')
+            value = _decode_value(records, start + 4 + length, record_offsets[i + 1])
+            entries.append((slots[i], key, value, hashes[i]))
+    finally:
+        sections.release()
+    return header, entries
+
+
+class MappedHashMap:
+    def __init__(self, path: str, function) -> None:
+        """
+        Open a file written by the dump() method of an SC or OA HashMap for read-only lookups.
+        The file is memory-mapped, not read: get and contains_key hash the key, read the hashes of its
+        home bucket from the mapping and decode only the entry that matches, so opening is instant
+        whatever the size of the map, and pages are only read from disk when a lookup touches them.
+        Values without a compact encoding are unpickled when get returns them, so only open files from a
+        trusted source: a crafted file can run arbitrary code.
+        :param path: file to open
+        :param function: hash function the map was built with
+        """
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._sections = _Sections(self._mmap, path)
+            if self._sections.swapped:
+                raise ValueError(f"{path} was written on a machine of the other byte order, use load() instead")
+            if self._sections.power_of_two:
+                function = finalized(function)
+            if fingerprint(function) != self._sections.fingerprint:
+                raise ValueError(f"{path} was written with a different hash function")
+        except BaseException:
+            self.close()
+            raise
+        self._hash_function = function
+        self._capacity = self._sections.capacity
+
+    def close(self) -> None:
+        """
+        Unmap the file. The map cannot be used afterwards.
+        """
+        sections = getattr(self, '_sections', None)
+        if sections is not None:
+            sections.release()
+            self._sections = None
+        if not self._mmap.closed:
+            self._mmap.close()
+
+    def __enter__(self) -> "MappedHashMap":
+        return self
+
+    def __exit__(self, *exception) -> None:
+        self.close()
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._sections.size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of the map the file was written from
+        """
+        return self._capacity
+
+    def _find(self, key: str) -> int:
+        """
+        Return the index of the key's entry in the file, or -1 if the key is not in it.
+        :param key: string to search for
+        """
+        hash = self._hash_function(key)
+        sections = self._sections
+        hashes = sections.hashes
+        encoded = None
+        for i in range(sections.offsets[hash % self._capacity], sections.offsets[hash % self._capacity + 1]):
+            if hashes[i] == hash:
+                if encoded is None:
+                    encoded = key.encode()
+                if sections.key(i) == encoded:
+                    return i
+        return -1
+
+    def get(self, key: str) -> object:
+        """
+        Return the value associated with the given key. If the key is not in the hash map, the method returns None.
+        :param key: string/key associated with value
+        :return: string/key associated with value or none
+        """
+        index = self._find(key)
+        if index >= 0:
+            return self._sections.value(index)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Return True if the given key is in the hash map, otherwise it returns False.
+        :param key: string to search for in the hash map
+        :return: True or False
+        """
+        return self._find(key) >= 0
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+    # imported here, the maps import this module
+    import os
+    import tempfile
+    from a6_include import hash_function_1, hash_function_2
+    import hash_map_oa
+    import hash_map_sc
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'map.bin')
+
+        print("\nwrite and read")
+        print("--------------")
+        values = (1, 2.5, None, 'text', (1, 2), True)
+        keys = ('apple', 'pear', 'fig', 'plum', 'kiwi', 'lime')
+        entries = [(hash_function_2(key) % 7, key, value, hash_function_2(key)) for key, value in zip(keys, values)]
+        write(path, 'sc', 7, entries, function=hash_function_2, max_load=0.75, shrink_load=0.2)
+        header, read_entries = read(path, 'sc', hash_function_2)
+        print(header)
+        print(sorted(read_entries) == sorted(entries))
+        for kind, function in (('oa', hash_function_2), ('sc', hash_function_1)):
+            try:
+                read(path, kind, function)
+            except ValueError as error:
+                print(str(error).replace(path, 'map.bin'))
+
+        print("\nMappedHashMap")
+        print("-------------")
+        with MappedHashMap(path, hash_function_2) as mapped:
+            print(mapped.get_size(), mapped.get_capacity(), [mapped.get(key) for key in keys])
+            print(mapped.get('grape'), mapped.contains_key('fig'), mapped.contains_key('grape'))
+        with open(path, 'wb') as file:
+            file.write(b'not a map')
+        try:
+            MappedHashMap(path, hash_function_2)
+        except ValueError as error:
+            print(str(error).replace(path, 'map.bin'))
+
+        print("\nSC dump, load and MappedHashMap")
+        print("-------------------------------")
+        m = hash_map_sc.HashMap(11, hash_function_2, max_load=0.75, growth_factor=3.0, shrink_load=0.2)
+        for i in range(100):
+            m.put('key' + str(i), i)
+        m.dump(path)
+        loaded = hash_map_sc.HashMap.load(path, hash_function_2)
+        print(loaded.get_size(), loaded.get_capacity(), loaded._max_load, loaded._growth_factor,
+              loaded._shrink_load, loaded._min_capacity)
+        print(str(loaded.get_keys_and_values()) == str(m.get_keys_and_values()))
+        with MappedHashMap(path, hash_function_2) as mapped:
+            print(all(mapped.get('key' + str(i)) == i for i in range(100)), mapped.contains_key('key100'))
+
+        print("\nOA dump, load and MappedHashMap with a non-default tombstone_ratio")
+        print("------------------------------------------------------------------")
+        m = hash_map_oa.HashMap(11, hash_function_2, probe='linear', max_load=0.8, tombstone_ratio=0.1,
+                                min_capacity=17)
+        for i in range(100):
+            m.put('key' + str(i), i)
+        for i in range(0, 100, 3):
+            m.remove('key' + str(i))
+        m.dump(path)
+        loaded = hash_map_oa.HashMap.load(path, hash_function_2)
+        print(loaded.get_size(), loaded.get_capacity(), loaded._probe_strategy, loaded._max_load,
+              loaded._tombstone_ratio, loaded._min_capacity, loaded.get_tombstones())
+        print(str(loaded.get_keys_and_values()) == str(m.get_keys_and_values()))
+        loaded = hash_map_oa.HashMap.load(path, hash_function_2, tombstone_ratio=0.2)  # options override
+        print(loaded._tombstone_ratio)
+        with MappedHashMap(path, hash_function_2) as mapped:
+            print(all(mapped.get('key' + str(i)) == (None if i % 3 == 0 else i) for i in range(100)),
+                  mapped.contains_key('key0'), mapped.contains_key('key1'))
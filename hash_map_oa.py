@@ -5,33 +5,127 @@
 # Due Date: 12/2/2022
 # Description: Implement the HashMap class using a dynamic array to store a hash table, and implement Open Addressing
 # with Quadratic Probing for collision resolution inside that dynamic array.
+# The probe sequence can also be linear or use double hashing. Every strategy is walked the same way, by
+# adding a step that grows by a fixed increment: the j-th step is first + (j - 1) * increment.
+#   linear     first 1, increment 0
+#   quadratic  first 1, increment 2, which visits index + j^2 (for prime capacities), or increment 1, which
+#              visits index + j(j + 1)/2 (triangular, reaches every slot of a power-of-two table)
+#   double     first derived from the hash (a second hash), increment 0
 
-from a6_include import (DynamicArray, DynamicArrayException, HashEntry,
-                        hash_function_1, hash_function_2)
+import math
+import os
+import tempfile
+import time
 
+from a6_include import (DynamicArray, HashEntry, MapViews, GOLDEN_64, MASK_64, as_list, finalized, hash_many, is_prime,
+                        next_power_of_two, next_prime, hash_function_1, hash_function_2)
+from hash_map_frozen import FrozenHashMap
+import hash_map_io
 
-class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+
+# placed in an old table's slot once its entry has moved to the new table during an incremental resize
+_MIGRATED = HashEntry(None, None)
+_MIGRATED.is_tombstone = True
+
+PROBE_STRATEGIES = ('linear', 'quadratic', 'double')
+
+
+class HashMap(MapViews):
+    def __init__(self, capacity: int, function, *, probe: str = 'quadratic', power_of_two: bool = False,
+                 incremental: bool = False, migrate_step: int = 8, tombstone_ratio: float = 0.25,
+                 max_load: float = 0.5, growth_factor: float = 2.0, min_capacity: int = None,
+                 shrink_load: float = None) -> None:
         """
         Initialize new HashMap that uses
         quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        probe selects the probe sequence instead: one of PROBE_STRATEGIES.
+        With power_of_two=True, capacities are powers of two instead of primes, hashes are passed
+        through mix_hash so that the home slot, which then only depends on the low bits, uses all of them,
+        and probing is triangular instead of quadratic.
+        With incremental=True, growing the table is spread over the following operations,
+        each of which moves up to migrate_step slots, instead of happening all at once in put.
+        Once tombstones fill tombstone_ratio of the table, it is rebuilt in place to reclaim them.
+        The table grows by growth_factor once the load factor reaches max_load. Quadratic probing on a
+        prime table only reaches half of the slots, so there max_load can be at most 0.5; the other probe
+        sequences reach every slot and allow any max_load below 1. Live entries and tombstones together
+        must leave room for empty slots, so max_load + tombstone_ratio can be at most 1.
+        min_capacity, if given, is the smallest capacity the map is created with or shrinks to; by
+        default it is the capacity the map was created with. Explicit resize_table calls are not limited.
+        With shrink_load set, a remove that takes the load factor below it shrinks the table so the load
+        factor is back at half of max_load. shrink_load must be less than that, and less than max_load
+        divided by the growth factor, the load factor just after the table grows (in power-of-two mode
+        growth_factor rounded up to a power of two), so a shrunk or just grown map sits between the grow
+        and shrink thresholds and puts and removes around either one cannot make it resize back and forth.
+        Rounding up to a prime grows the table a little more than growth_factor, so leave some margin.
         """
-        self._buckets = DynamicArray()
+        if probe not in PROBE_STRATEGIES:
+            raise ValueError(f"probe must be one of {', '.join(PROBE_STRATEGIES)}")
+        if migrate_step < 1:
+            raise ValueError("migrate_step must be at least 1")
+        if not 0 < tombstone_ratio <= 0.5:
+            raise ValueError("tombstone_ratio must be greater than 0 and at most 0.5")
+        if probe == 'quadratic' and not power_of_two:
+            if not 0 < max_load <= 0.5:
+                raise ValueError("max_load must be greater than 0 and at most 0.5 for quadratic probing")
+        elif not 0 < max_load < 1:
+            raise ValueError("max_load must be greater than 0 and less than 1")
+        if max_load + tombstone_ratio > 1:
+            raise ValueError("max_load and tombstone_ratio together must be at most 1")
+        if not growth_factor > 1:
+            raise ValueError("growth_factor must be greater than 1")
+        if min_capacity is not None and min_capacity < 1:
+            raise ValueError("min_capacity must be at least 1")
+        # the factor the table actually grows by: rounding to a power of two can make it larger
+        growth = next_power_of_two(math.ceil(growth_factor)) if power_of_two else growth_factor
+        if shrink_load is not None and not 0 < shrink_load < min(max_load / 2, max_load / growth):
+            raise ValueError("shrink_load must be greater than 0 and less than half of max_load "
+                             "and max_load divided by the growth factor")
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+        if min_capacity is not None:
+            capacity = max(capacity, min_capacity)
+
+        self._power_of_two = power_of_two
+        if power_of_two:
+            self._capacity = next_power_of_two(capacity)
+            function = finalized(function)
+        else:
+            # capacity must be a prime number
+            self._capacity = self._next_prime(capacity)
+        self._probe_strategy = probe
+        self._double_hashing = probe == 'double'
+        if probe == 'quadratic':
+            self._probe_increment = 1 if power_of_two else 2
+        else:
+            self._probe_increment = 0
+        self._buckets = DynamicArray.filled(self._capacity)
 
         self._hash_function = function
         self._size = 0
+        self._tombstones = 0  # removed entries still occupying a slot of self._buckets
+        self._tombstone_ratio = tombstone_ratio
+        self._max_load = max_load
+        self._growth_factor = growth_factor
+        self._shrink_load = shrink_load
+        self._min_capacity = self._capacity  # shrinking never goes below the capacity the map was created with
+
+        self._incremental = incremental
+        self._migrate_step = migrate_step
+        self._old_buckets = None  # table being migrated away from during an incremental resize
+        self._old_capacity = 0
+        self._migrate_index = 0  # old slots below this index have been moved into self._buckets
+
+        self._resizes = 0
+        self._shrinks = 0
+        self._purges = 0
+        self._rehashed = 0
+        self._resize_seconds = 0.0
 
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        Finishes an incremental resize first, so every entry is printed in its final bucket.
         """
+        self._finish_resize()
         out = ''
         for i in range(self._buckets.length()):
             out += str(i) + ': ' + str(self._buckets[i]) + '\n'
@@ -84,6 +178,29 @@ class HashMap:
         """
         return self._capacity
 
+    def get_tombstones(self) -> int:
+        """
+        Return number of removed entries still occupying a slot
+        """
+        return self._tombstones
+
+    def _round_capacity(self, capacity: int) -> int:
+        """
+        Round a capacity up to a valid table size: a power of two in power-of-two mode, otherwise
+        a prime, found in the precomputed prime table instead of by trial division.
+        """
+        if self._power_of_two:
+            return next_power_of_two(capacity)
+        if is_prime(capacity):
+            return capacity
+        return next_prime(capacity)
+
+    def _grown_capacity(self, capacity: int) -> int:
+        """
+        Return the capacity a table of the given capacity grows to, before rounding.
+        """
+        return max(int(capacity * self._growth_factor), capacity + 1)
+
     # ------------------------------------------------------------------ #
 
     def put(self, key: str, value: object) -> None:
@@ -95,36 +212,232 @@ class HashMap:
         :param value: object to be added
         :return: none
         """
-        # table must be resized to double its current
+        # table must be resized to growth_factor (by default double) its current
         # capacity when this method is called and the current load factor of the table is
-        # greater than or equal to 0.5
-        if self.table_load() >= 0.5:
-            self.resize_table(self._capacity * 2)
-
-        hash = self._hash_function(key)  # compute a value based on the key
-        index = hash % self._capacity  # makes sure the value gets assigned to an index that exists in the array
-
-        if self._buckets[index] is None or self._buckets[index].is_tombstone is True:
-            self._buckets[index] = HashEntry(key, value)  # insert/update new key/value pair
-            self._size += 1
-        elif self._buckets[index].key == key:
-            self._buckets[index] = HashEntry(key, value)
-        else:
-            j = 1
-            quad_index = (index + j ** 2) % self._capacity  # quadratic probing
-            while self._buckets[quad_index] is not None:
-                if self._buckets[quad_index].is_tombstone is True:
-                    self._buckets[quad_index] = HashEntry(key, value)
-                    self._size += 1
-                    return
-                elif self._buckets[quad_index].key == key:  # if key exists
-                    self._buckets[quad_index] = HashEntry(key, value)
-                    return
-                # continue probing for key
-                j += 1
-                quad_index = (index + j ** 2) % self._capacity
-            self._buckets[quad_index] = HashEntry(key, value)
-            self._size += 1
+        # greater than or equal to max_load (by default 0.5)
+        if self._old_buckets is not None:
+            self._migrate(self._migrate_step)
+
+        if self.table_load() >= self._max_load:
+            if self._incremental:
+                self._start_resize(self._grown_capacity(self._capacity))
+            else:
+                self.resize_table(self._grown_capacity(self._capacity))
+
+        hash = self._hash_function(key)
+        if self._old_buckets is not None:
+            entry = self._probe(self._old_buckets, self._old_capacity, key, hash)[0]
+            if entry is not None:  # key has not been migrated yet, update it where it is
+                entry.value = value
+                return
+        self._insert(key, value, hash)
+
+    def _slot(self, key: str, default: object) -> (HashEntry, bool):
+        """
+        Return the live entry for key, adding it with the default value first if it is not in the hash map.
+        The map grows and hashes the key once, as put does, and the key is found or added in one probe.
+        :param key: string to look up or add
+        :param default: value for a new entry
+        :return: tuple of the entry and True if it was just added, False if the key was already there
+        """
+        if self._old_buckets is not None:
+            self._migrate(self._migrate_step)
+
+        if self.table_load() >= self._max_load:
+            if self._incremental:
+                self._start_resize(self._grown_capacity(self._capacity))
+            else:
+                self.resize_table(self._grown_capacity(self._capacity))
+
+        hash = self._hash_function(key)
+        if self._old_buckets is not None:
+            entry = self._probe(self._old_buckets, self._old_capacity, key, hash)[0]
+            if entry is not None:  # key has not been migrated yet, use it where it is
+                return entry, False
+
+        buckets = self._buckets
+        entry, free = self._probe(buckets, self._capacity, key, hash)
+        if entry is not None:
+            return entry, False
+        if free < 0:  # the probe sequence is full, let _insert grow the table
+            return self._insert(key, default, hash), True
+
+        if buckets.get_unchecked(free) is not None:  # reuse the first tombstone on the probe sequence
+            self._tombstones -= 1
+        entry = HashEntry(key, default, hash)
+        buckets.set_unchecked(free, entry)
+        self._size += 1
+        return entry, True
+
+    def _probe_steps(self, hash: int, capacity: int) -> (int, int):
+        """
+        Return the first step of the probe sequence for the given hash and how much each following step grows.
+        For double hashing the first step is a second hash, a multiplicative scramble of the hash so that
+        keys with nearby hashes step differently, made coprime with the capacity so the sequence reaches
+        every slot.
+        """
+        if self._double_hashing:
+            second = ((hash * GOLDEN_64) & MASK_64) >> 32
+            if self._power_of_two:
+                return second % capacity | 1, 0
+            return 1 + second % (capacity - 1), 0
+        return 1, self._probe_increment
+
+    def _probe(self, buckets: DynamicArray, capacity: int, key: str, hash: int) -> (HashEntry, int):
+        """
+        Walk the probe sequence of the key until the key or an empty slot is found.
+        This is the one probe loop of the map: lookups, inserts, removes and rehashing all use it.
+        :param buckets: table to search
+        :param capacity: capacity of that table
+        :param key: string to search for
+        :param hash: full hash of the key
+        :return: tuple of the key's live entry, or None if the key is not in the table, and the index
+                 of the first tombstone or empty slot on the sequence, or -1 if there is none
+        """
+        if self._double_hashing:
+            step, increment = self._probe_steps(hash, capacity)
+        else:  # same as _probe_steps, without the call on the hot path
+            step, increment = 1, self._probe_increment
+        free = -1
+        j = 0
+        quad_index = hash % capacity
+        entry = buckets.get_unchecked(quad_index)
+        while entry is not None and j < capacity:
+            if entry.is_tombstone is True:
+                if free < 0:
+                    free = quad_index
+            elif entry.hash == hash and entry.key == key:
+                return entry, free
+            # continue probing for key
+            j += 1
+            quad_index = (quad_index + step) % capacity
+            step += increment
+            entry = buckets.get_unchecked(quad_index)
+        if entry is None and free < 0:
+            free = quad_index
+        return None, free
+
+    def _lookup(self, key: str) -> HashEntry:
+        """
+        Return the live entry for key from the current table, or from the old table while
+        an incremental resize is in progress. Advances the resize by one step.
+        :param key: string to search for
+        :return: matching entry, or None if the key is not in the hash map
+        """
+        hash = self._hash_function(key)
+        if self._old_buckets is None:
+            return self._probe(self._buckets, self._capacity, key, hash)[0]
+
+        self._migrate(self._migrate_step)
+        entry = self._probe(self._buckets, self._capacity, key, hash)[0]
+        if entry is None and self._old_buckets is not None:
+            entry = self._probe(self._old_buckets, self._old_capacity, key, hash)[0]
+        return entry
+
+    def _start_resize(self, new_capacity: int) -> None:
+        """
+        Begin an incremental resize: switch to an empty table of new_capacity slots and
+        keep the current table around until all of its slots have been migrated.
+        :param new_capacity: capacity of internal hash table
+        :return: none
+        """
+        self._finish_resize()
+        new_capacity = self._round_capacity(new_capacity)
+
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._buckets = DynamicArray.filled(new_capacity)
+        self._capacity = new_capacity
+        self._migrate_index = 0
+        self._tombstones = 0
+        self._resizes += 1
+
+    def _migrate(self, count: int) -> None:
+        """
+        Move the live entries of up to count old slots into the new table. Moved slots are
+        marked as tombstones so probe sequences through the old table stay intact.
+        :param count: number of old slots to move
+        :return: none
+        """
+        start = time.perf_counter()
+        old_buckets = self._old_buckets
+        end = min(self._migrate_index + count, self._old_capacity)
+        for i in range(self._migrate_index, end):
+            entry = old_buckets.get_unchecked(i)
+            if entry is not None and entry.is_tombstone is False:
+                self._place(entry)
+                old_buckets.set_unchecked(i, _MIGRATED)
+        self._migrate_index = end
+
+        if end == self._old_capacity:  # migration complete
+            self._old_buckets = None
+            self._old_capacity = 0
+        self._resize_seconds += time.perf_counter() - start
+
+    def _finish_resize(self) -> None:
+        """
+        Complete any incremental resize in progress, so the whole map is in self._buckets.
+        :return: none
+        """
+        if self._old_buckets is not None:
+            self._migrate(self._old_capacity)
+
+    def _place(self, entry: HashEntry) -> None:
+        """
+        Store an existing entry, whose key is known not to be in the table, in the first
+        free slot of its probe sequence. The size is not changed.
+        :param entry: entry to store
+        :return: none
+        """
+        buckets = self._buckets
+        free = self._probe(buckets, self._capacity, entry.key, entry.hash)[1]
+        if buckets.get_unchecked(free) is not None:  # reusing a tombstone
+            self._tombstones -= 1
+        buckets.set_unchecked(free, entry)
+        self._rehashed += 1
+
+    def _purge(self) -> None:
+        """
+        Rebuild the current table in place, at the same capacity, without its tombstones.
+        :return: none
+        """
+        start = time.perf_counter()
+        buckets = self._buckets
+        entries = [entry for entry in buckets.get_slice() if entry is not None and entry.is_tombstone is False]
+        buckets.fill(None)
+
+        self._tombstones = 0
+        for entry in entries:
+            self._place(entry)
+        self._purges += 1
+        self._resize_seconds += time.perf_counter() - start
+
+    def _insert(self, key: str, value: object, hash: int) -> HashEntry:
+        """
+        Insert or update the key/value pair without checking the load factor.
+        :param key: string to be added
+        :param value: object to be added
+        :param hash: full hash of the key
+        :return: the key's entry
+        """
+        buckets = self._buckets
+
+        # the key may sit past a tombstone, so the probe remembers the first tombstone but keeps
+        # going until an empty slot proves the key is not in the table
+        entry, free = self._probe(buckets, self._capacity, key, hash)
+        if entry is not None:  # if key exists
+            entry.value = value
+            return entry
+        if free < 0:  # the probe sequence is full, which the load factor limit should rule out
+            self.resize_table(self._grown_capacity(self._capacity))
+            return self._insert(key, value, hash)
+
+        if buckets.get_unchecked(free) is not None:  # reuse the first tombstone on the probe sequence
+            self._tombstones -= 1
+        entry = HashEntry(key, value, hash)
+        buckets.set_unchecked(free, entry)  # insert new key/value pair
+        self._size += 1
+        return entry
 
     def table_load(self) -> float:
         """
@@ -138,11 +451,8 @@ class HashMap:
         Return the number of empty buckets in the hash table.
         :return: number of empty buckets
         """
-        count = 0
-        for i in range(self._buckets.length()):
-            if self._buckets[i] is None or self._buckets[i].is_tombstone is True:  # check if bucket is empty
-                count += 1
-        return count
+        self._finish_resize()
+        return self._capacity - self._size  # every slot without a live entry, tombstones included
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -150,6 +460,7 @@ class HashMap:
         must remain in the new hash map, and all hash table links must be rehashed.
         If new_capacity is not less than the current number of elements in the hash map, the method does nothing.
         Make sure new_capacity is a prime number. If not, change it to the next highest prime number.
+        In power-of-two mode it is rounded up to a power of two instead.
         :param new_capacity: capacity of internal hash table
         :return: none
         """
@@ -157,22 +468,27 @@ class HashMap:
         if new_capacity < self._size or new_capacity < 1:
             return
 
-        if self._is_prime(new_capacity) is False:  # change non-prime number to next highest prime number
-            new_capacity = self._next_prime(new_capacity)
+        self._finish_resize()
 
-        new_hash_map = DynamicArray()  # create new array with new_capacity
-        for i in range(self._buckets.length()):
-            if self._buckets[i] is not None and self._buckets[i].is_tombstone is False:
-                new_hash_map.append(self._buckets[i])
+        new_capacity = self._round_capacity(new_capacity)  # change non-prime number to next highest prime number
 
-        self._size = 0
+        # keep growing until every entry fits under max_load, as put would while rehashing
+        while self._size - 1 >= new_capacity * self._max_load:
+            new_capacity = self._round_capacity(self._grown_capacity(new_capacity))
+
+        start = time.perf_counter()
+        old_buckets = self._buckets
         self._capacity = new_capacity
-        self._buckets = DynamicArray()
-        for i in range(new_capacity):
-            self._buckets.append(None)
+        self._tombstones = 0
+        self._buckets = DynamicArray.filled(new_capacity)
 
-        for i in range(new_hash_map.length()):
-            self.put(new_hash_map[i].key, new_hash_map[i].value)  # rehash into new hash map
+        for entry in old_buckets.get_slice():
+            if entry is not None and entry.is_tombstone is False:
+                # rehash into new hash map using the cached hash instead of calling the hash function
+                self._place(entry)
+
+        self._resizes += 1
+        self._resize_seconds += time.perf_counter() - start
 
     def get(self, key: str) -> object:
         """
@@ -180,21 +496,9 @@ class HashMap:
         :param key: string/key associated with value
         :return: string/key associated with value or none
         """
-        hash = self._hash_function(key)
-        index = hash % self._capacity
-
-        if self._buckets[index] is None:  # key is not in hash map
-            return
-        elif self._buckets[index].key == key and self._buckets[index].is_tombstone is False:  # key in hash map
-            return self._buckets[index].value
-        j = 1
-        quad_index = (index + j ** 2) % self._capacity
-        while self._buckets[quad_index] is not None:
-            if self._buckets[quad_index].key == key and self._buckets[quad_index].is_tombstone is False:
-                return self._buckets[quad_index].value
-            # continue probing for key
-            j += 1
-            quad_index = (index + j ** 2) % self._capacity
+        entry = self._lookup(key)
+        if entry is not None:  # key in hash map
+            return entry.value
 
     def contains_key(self, key: str) -> bool:
         """
@@ -202,23 +506,66 @@ class HashMap:
         :param key: string to search for in the hash map
         :return: True or False
         """
-        hash = self._hash_function(key)
-        index = hash % self._capacity
+        return self._lookup(key) is not None
 
-        if self._buckets[index] is None or self._buckets[index].is_tombstone is True:
-            return False
-        elif self._buckets[index].key == key:
-            return True
-        else:
-            j = 1
-            quad_index = (index + j ** 2) % self._capacity
-            while self._buckets[quad_index] is not None:
-                if self._buckets[quad_index].key == key:
-                    return True
-                # continue probing for key
-                j += 1
-                quad_index = (index + j ** 2) % self._capacity
-            return False
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Return the value associated with the given key. If the key is not in the hash map,
+        it is added with the default value, which is returned.
+        :param key: string to look up or add
+        :param default: value to add if the key is not in the hash map
+        :return: value associated with the key
+        """
+        return self._slot(key, default)[0].value
+
+    def get_or_insert(self, key: str, factory) -> object:
+        """
+        Return the value associated with the given key. If the key is not in the hash map,
+        factory is called with no arguments and its result is added and returned, so values that are
+        costly to build are only built for new keys.
+        :param key: string to look up or add
+        :param factory: callable that returns the value for a new key
+        :return: value associated with the key
+        """
+        entry, added = self._slot(key, None)
+        if added:
+            try:
+                entry.value = factory()
+            except BaseException:
+                self._discard(key)  # take the new key out again, without shrinking or purging the table
+                raise
+        return entry.value
+
+    def increment(self, key: str, delta=1):
+        """
+        Add delta to the value associated with the given key. If the key is not in the hash map,
+        it is added with delta as its value.
+        :param key: string whose count to change
+        :param delta: amount to add
+        :return: the new value
+        """
+        entry, added = self._slot(key, delta)
+        if not added:
+            entry.value += delta
+        return entry.value
+
+    def update(self, key: str, function, default: object = None) -> object:
+        """
+        Replace the value associated with the given key by function(value). If the key is not in the
+        hash map, it is added with the value function(default).
+        :param key: string whose value to change
+        :param function: callable that takes the current value and returns the new one
+        :param default: value passed to function if the key is not in the hash map
+        :return: the new value
+        """
+        entry, added = self._slot(key, default)
+        try:
+            entry.value = function(entry.value)
+        except BaseException:
+            if added:
+                self._discard(key)  # take the new key out again, without shrinking or purging the table
+            raise
+        return entry.value
 
     def remove(self, key: str) -> None:
         """
@@ -226,34 +573,63 @@ class HashMap:
         :param key: string to remove in the hash map
         :return: none
         """
-        hash = self._hash_function(key)
-        index = hash % self._capacity
+        if self._old_buckets is not None:
+            self._migrate(self._migrate_step)
+        if not self._discard(key):
+            return
+
+        if (self._shrink_load is not None and self._size < self._shrink_load * self._capacity
+                and self._capacity > self._min_capacity):
+            self._shrink()  # the smaller table is built without tombstones, no purge needed
+        elif self._tombstones >= self._tombstone_ratio * self._capacity:
+            self._purge()  # too many tombstones to probe through, reclaim them
 
-        if self._buckets[index] is not None and self._buckets[index].is_tombstone is False and self._buckets[index].key == key:
+    def _discard(self, key: str) -> bool:
+        """
+        Turn the entry of the given key into a tombstone, leaving the capacity and the other tombstones as they are.
+        :param key: string to remove in the hash map
+        :return: True if the key was removed, False if it was not in the hash map
+        """
+        hash = self._hash_function(key)
+        entry = self._probe(self._buckets, self._capacity, key, hash)[0]
+        if entry is not None:
             # delete hash entry
-            self._buckets[index].is_tombstone = True
+            entry.is_tombstone = True
             self._size -= 1
+            self._tombstones += 1
+            return True
+        if self._old_buckets is not None:
+            entry = self._probe(self._old_buckets, self._old_capacity, key, hash)[0]
+            if entry is not None:  # key has not been migrated yet, the old table is discarded once it has
+                entry.is_tombstone = True
+                self._size -= 1
+                return True
+        return False
+
+    def _shrink(self) -> None:
+        """
+        Shrink the table to the capacity that puts the load factor at half of max_load, or to the minimum capacity.
+        :return: none
+        """
+        new_capacity = self._round_capacity(max(math.ceil(self._size * 2 / self._max_load), self._min_capacity))
+        if new_capacity >= self._capacity:
+            return
+        self._shrinks += 1
+        if self._incremental:
+            self._start_resize(new_capacity)
         else:
-            j = 1
-            quad_index = (index + j ** 2) % self._capacity
-            while self._buckets[quad_index] is not None:
-                if self._buckets[quad_index].is_tombstone is False and self._buckets[quad_index].key == key:
-                    # delete hash entry
-                    self._buckets[quad_index].is_tombstone = True
-                    self._size -= 1
-                    return
-                # continue probing for key
-                j += 1
-                quad_index = (index + j ** 2) % self._capacity
+            self.resize_table(new_capacity)
 
     def clear(self) -> None:
         """
         Clear the contents of the hash map.
         :return: none
         """
-        for i in range(self._capacity):
-            self._buckets[i] = None
+        self._old_buckets = None  # drop any incremental resize in progress
+        self._old_capacity = 0
+        self._buckets.fill(None)
         self._size = 0
+        self._tombstones = 0
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -261,37 +637,201 @@ class HashMap:
         stored in the hash map.
         :return: dynamic array consisting of key/value pairs
         """
+        self._finish_resize()
         new_array = DynamicArray()
-        for i in range(self._capacity):
-            if self._buckets[i] is not None and self._buckets[i].is_tombstone is False:
-                new_array.append((self._buckets[i].key, self._buckets[i].value))  # store key/value pairs in new array
+        for entry in self._buckets.get_slice():
+            if entry is not None and entry.is_tombstone is False:
+                new_array.append((entry.key, entry.value))  # store key/value pairs in new array
         return new_array
 
-    def __iter__(self):
+    def stats(self) -> dict:
+        """
+        Return health statistics for the hash map. Counters are maintained as the map changes;
+        the probe length distributions are measured on each call by walking the probe sequences
+        of the current table, which is O(capacity).
+        Probe lengths count the slots examined: for a hit up to and including the key's slot, for a
+        miss starting at each slot up to and including the first empty one.
+        :return: dictionary with size, capacity, load factor, tombstones, hit and miss probe length
+                 distributions (probe length: count), number of resizes and how many of them were
+                 shrinks, number of tombstone purges,
+                 entries moved by resizes and purges, seconds spent on both and whether an
+                 incremental resize is in progress
+        """
+        buckets = self._buckets.get_slice()
+        capacity = self._capacity
+        hits = {}
+        misses = {}
+        for i in range(capacity):
+            entry = buckets[i]
+            if entry is not None and entry.is_tombstone is False:
+                step, increment = self._probe_steps(entry.hash, capacity)
+                index = entry.hash % capacity
+                j = 0
+                while index != i and j < capacity:
+                    j += 1
+                    index = (index + step) % capacity
+                    step += increment
+                hits[j + 1] = hits.get(j + 1, 0) + 1
+
+            # a miss with home slot i, i * (capacity + 1) spreads the double hashing steps over the slots
+            step, increment = self._probe_steps(i * (capacity + 1), capacity)
+            index = i
+            j = 0
+            while buckets[index] is not None and j < capacity:
+                j += 1
+                index = (index + step) % capacity
+                step += increment
+            misses[j + 1] = misses.get(j + 1, 0) + 1
+
+        return {
+            'size': self._size,
+            'capacity': capacity,
+            'load': self.table_load(),
+            'tombstones': self._tombstones,
+            'probe_lengths_hit': dict(sorted(hits.items())),
+            'probe_lengths_miss': dict(sorted(misses.items())),
+            'resizes': self._resizes,
+            'shrinks': self._shrinks,
+            'purges': self._purges,
+            'rehashed_entries': self._rehashed,
+            'resize_seconds': self._resize_seconds,
+            'resizing': self._old_buckets is not None,
+        }
+
+    def put_many(self, pairs) -> None:
         """
-        Enable the hash map to iterate across itself.
+        Insert or update every key/value pair in pairs. The table is resized at most once,
+        up front, to a capacity that keeps the load factor below max_load for all pairs.
+        :param pairs: DynamicArray or iterable of (key, value) tuples
         :return: none
         """
-        self._index = 0
-        return self
+        items = as_list(pairs)
+        required = self._size + len(items)  # upper bound, duplicate keys only make it smaller
+        if required > self._capacity * self._max_load:
+            self.resize_table(math.ceil(required / self._max_load))
+        else:
+            self._finish_resize()
+
+        insert = self._insert
+        hashes = hash_many(self._hash_function, [key for key, _ in items])
+        for (key, value), hash in zip(items, hashes):
+            insert(key, value, hash)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Look up every key in keys.
+        :param keys: DynamicArray or iterable of keys
+        :return: dynamic array of the associated values, None for keys that are not in the map
+        """
+        self._finish_resize()
+        result = DynamicArray()
+        probe = self._probe
+        buckets = self._buckets
+        capacity = self._capacity
+        keys = as_list(keys)
+        for key, hash in zip(keys, hash_many(self._hash_function, keys)):
+            entry = probe(buckets, capacity, key, hash)[0]
+            result.append(entry.value if entry is not None else None)
+        return result
 
-    def __next__(self):
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Check every key in keys for membership.
+        :param keys: DynamicArray or iterable of keys
+        :return: dynamic array of True or False, one per key
+        """
+        self._finish_resize()
+        result = DynamicArray()
+        probe = self._probe
+        buckets = self._buckets
+        capacity = self._capacity
+        keys = as_list(keys)
+        for key, hash in zip(keys, hash_many(self._hash_function, keys)):
+            result.append(probe(buckets, capacity, key, hash)[0] is not None)
+        return result
+
+    def __iter__(self):
         """
-        Return the next item in the hash map, based on the current location of the
-        iterator.
+        Iterate over the live entries of the hash map, in slot order, as HashEntry objects.
+        Each call returns a new, independent iterator, so iterations can be nested. A resize in progress
+        is finished first.
+        """
+        self._finish_resize()
+        buckets = self._buckets
+        for i in range(self._capacity):
+            entry = buckets.get_unchecked(i)
+            if entry is not None and entry.is_tombstone is False:
+                yield entry
+
+    def dump(self, path: str) -> None:
+        """
+        Save the hash map to path in the binary format of hash_map_io, with every entry's cached hash and
+        slot, so that load() can rebuild it without rehashing or probing and MappedHashMap can read it in
+        place. A resize in progress is finished and tombstones are purged first, so that the saved slots
+        are reachable without them.
+        :param path: file to write
         :return: none
         """
-        try:
-            while True:
-                if self._buckets[self._index] is not None and self._buckets[self._index].is_tombstone is False:
-                    break  # if no next items available
-                else:
-                    self._index = self._index + 1  # go to next index
-            item = self._buckets[self._index]  # retrieve the next item
-            self._index += 1
-        except DynamicArrayException:
-            raise StopIteration
-        return item
+        self._finish_resize()
+        if self._tombstones:
+            self._purge()
+        entries = []
+        buckets = self._buckets
+        for i in range(self._capacity):
+            entry = buckets.get_unchecked(i)
+            if entry is not None:
+                entries.append((i, entry.key, entry.value, entry.hash))
+        hash_map_io.write(path, 'oa', self._capacity, entries, function=self._hash_function,
+                          power_of_two=self._power_of_two, probe=PROBE_STRATEGIES.index(self._probe_strategy),
+                          max_load=self._max_load, growth_factor=self._growth_factor,
+                          tombstone_ratio=self._tombstone_ratio, shrink_load=self._shrink_load,
+                          min_capacity=self._min_capacity)
+
+    @classmethod
+    def load(cls, path: str, function, **options) -> "HashMap":
+        """
+        Rebuild a hash map saved by dump(), with the same settings, at the same capacity and with every
+        entry in the same slot. Entries are stored straight into their saved slots with their saved hashes:
+        the hash function is only called once, to check that it is the one the map was saved with.
+        Values without a compact encoding are unpickled, so only load files from a trusted source.
+        :param path: file to read
+        :param function: hash function the map was built with
+        :param options: other keyword arguments for the constructor, such as incremental; they override
+                        the saved settings, except probe and power_of_two, which set where each entry is stored;
+                        min_capacity=None keeps the saved minimum capacity
+        :return: the hash map
+        """
+        header, entries = hash_map_io.read(path, 'oa', function)
+        capacity = header['capacity']
+        settings = {'probe': PROBE_STRATEGIES[header['probe']], 'power_of_two': header['power_of_two'],
+                    'max_load': header['max_load'], 'growth_factor': header['growth_factor'],
+                    'tombstone_ratio': header['tombstone_ratio'], 'shrink_load': header['shrink_load'],
+                    'min_capacity': header['min_capacity']}
+        for name in ('probe', 'power_of_two'):  # the saved slots only hold for the saved table layout
+            if name in options and options[name] != settings[name]:
+                raise ValueError(f"{name} cannot be changed when loading a hash map")
+        settings.update(options)
+        if settings['min_capacity'] is None:
+            settings['min_capacity'] = header['min_capacity']
+        m = cls(capacity, function, **settings)
+        if m._capacity != capacity:  # the constructor rounds a capacity of 2 up, and applies min_capacity
+            m.resize_table(capacity)
+        m._min_capacity = m._round_capacity(settings['min_capacity'])  # not the capacity it was created with
+
+        buckets = m._buckets
+        for index, key, value, hash in entries:
+            buckets.set_unchecked(index, HashEntry(key, value, hash))
+        m._size = len(entries)
+        return m
+
+    def freeze(self, **options) -> FrozenHashMap:
+        """
+        Return an immutable copy of the hash map built around a minimal perfect hash, for maps that are
+        only read from now on: every lookup reads one slot, and there is exactly one slot per key.
+        :param options: keyword arguments for FrozenHashMap, such as bucket_size
+        :return: frozen hash map of the key/value pairs from get_keys_and_values
+        """
+        return FrozenHashMap(self.get_keys_and_values(), **options)
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -502,3 +1042,49 @@ if __name__ == "__main__":
     print(m)
     for item in m:
         print('K:', item.key, 'V:', item.value)
+
+    print("\nput_many, get_many and contains_many")
+    print("------------------------------------")
+    m = HashMap(11, hash_function_2)
+    m.put_many(DynamicArray([(str(i), i * 10) for i in range(20)]))
+    print(m.get_size(), m.get_capacity(), m.get_many(['3', '19', '20']), m.contains_many(['3', '19', '20']))
+
+    print("\nincremental resizing, tombstones and stats")
+    print("------------------------------------------")
+    m = HashMap(11, hash_function_1, incremental=True, migrate_step=2)
+    for i in range(40):
+        m.put('key' + str(i), i)
+        if i == 25:  # part way through moving the entries to the grown table
+            print(m.get_capacity(), m.stats()['resizing'], m.get('key3'), m.get('key25'))
+    for i in range(30):  # a quarter of the slots filled with tombstones triggers a purge
+        m.remove('key' + str(i))
+    stats = m.stats()
+    print(m.get_size(), m.get_capacity(), m.get_tombstones(), stats['resizes'], stats['purges'], stats['resizing'])
+
+    print("\nsetdefault, get_or_insert, increment and update")
+    print("-----------------------------------------------")
+    m = HashMap(11, hash_function_1)
+    print(m.setdefault('a', 1), m.setdefault('a', 2), m.get_or_insert('b', list), m.increment('c'), m.increment('c', 5))
+    print(m.update('a', lambda value: value * 10), m.update('d', len, 'four'), sorted(m.items()))
+    try:
+        m.update('e', len, 5)
+    except TypeError:
+        print(m.contains_key('e'), m.get_size())  # a failed update takes the new key out again
+
+    print("\ndump, load, MappedHashMap and freeze")
+    print("------------------------------------")
+    m = HashMap(11, hash_function_2, probe='linear', max_load=0.8, tombstone_ratio=0.1)
+    for i in range(40):
+        m.put('key' + str(i), i)
+    for i in range(0, 40, 4):
+        m.remove('key' + str(i))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'map.bin')
+        m.dump(path)  # purges the tombstones first
+        loaded = HashMap.load(path, hash_function_2)  # with the saved probe, max_load and tombstone_ratio
+        print(loaded.get_size(), loaded.get_capacity() == m.get_capacity(), loaded.get_tombstones(),
+              str(loaded.get_keys_and_values()) == str(m.get_keys_and_values()))
+        with hash_map_io.MappedHashMap(path, hash_function_2) as mapped:
+            print(mapped.get_size(), mapped.get('key7'), mapped.contains_key('key8'), mapped.get('key40'))
+    frozen = m.freeze()
+    print(frozen.get_size(), frozen.get('key7'), frozen.get('key8'), sorted(frozen.items()) == sorted(m.items()))
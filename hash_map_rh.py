@@ -0,0 +1,395 @@
+# Course: CS261 - Data Structures
+# Assignment: 6 - HashMap
+# Description: Open Addressing HashMap with Robin Hood hashing. Keys are probed linearly, and an insert takes
+# the slot of any entry that is closer to its home slot than the new key is, so entries along a probe
+# sequence are ordered by displacement. A lookup can stop at the first entry that is closer to home than
+# the key would be, removes shift the following entries back instead of leaving tombstones, and the table
+# can run at a much higher load factor than quadratic probing. It supports the core API of hash_map_oa.HashMap
+# (put, get, contains_key, remove, resize_table, clear, get_keys_and_values, stats, the *_many bulk operations,
+# iteration and the keys/values/items views) and power-of-two capacities, but not probe strategies,
+# incremental resizing, shrinking, upsert methods, dump/load or freeze.
+
+import time
+
+from a6_include import (DynamicArray, HashEntry, MapViews, as_list, finalized, hash_many, is_prime, next_power_of_two,
+                        next_prime, hash_function_1, hash_function_2, hash_function_fnv1a)
+
+
+class HashMap(MapViews):
+    def __init__(self, capacity: int, function, *, max_load: float = 0.9, power_of_two: bool = False) -> None:
+        """
+        Initialize new HashMap that uses
+        Robin Hood hashing with linear probing for collision resolution
+        The table doubles once the load factor reaches max_load.
+        With power_of_two=True, capacities are powers of two instead of primes and hashes are passed
+        through mix_hash so that the home slot, which then only depends on the low bits, uses all of them.
+        """
+        if not 0 < max_load < 1:
+            raise ValueError("max_load must be greater than 0 and less than 1")
+
+        self._power_of_two = power_of_two
+        if power_of_two:
+            function = finalized(function)
+        self._max_load = max_load
+        self._capacity = self._round_capacity(capacity)
+        self._buckets = DynamicArray.filled(self._capacity)
+        self._hash_function = function
+        self._size = 0
+
+        self._resizes = 0
+        self._rehashed = 0
+        self._resize_seconds = 0.0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            out += str(i) + ': ' + str(self._buckets[i]) + '\n'
+        return out
+
+    def _round_capacity(self, capacity: int) -> int:
+        """
+        Round a capacity up to a valid table size: a power of two in power-of-two mode, otherwise a prime.
+        """
+        if self._power_of_two:
+            return next_power_of_two(capacity)
+        if is_prime(capacity):
+            return capacity
+        return next_prime(capacity)
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    def get_tombstones(self) -> int:
+        """
+        Return number of removed entries still occupying a slot, always 0 with backward-shift deletion
+        """
+        return 0
+
+    # ------------------------------------------------------------------ #
+
+    def _find(self, key: str, hash: int) -> int:
+        """
+        Probe for the slot holding the given key. The probe stops at an empty slot or at an entry
+        closer to its home slot than the key would be, since the key would have taken that slot.
+        :param key: string to search for
+        :param hash: full hash of the key
+        :return: index of the key's slot, or -1 if the key is not in the hash map
+        """
+        buckets = self._buckets
+        capacity = self._capacity
+        index = hash % capacity
+        distance = 0
+        entry = buckets.get_unchecked(index)
+        while entry is not None:
+            if entry.hash == hash and entry.key == key:
+                return index
+            if (index - entry.hash) % capacity < distance:  # entry is richer than the key, key is absent
+                return -1
+            distance += 1
+            index += 1
+            if index == capacity:
+                index = 0
+            entry = buckets.get_unchecked(index)
+        return -1
+
+    def _place(self, entry: HashEntry) -> None:
+        """
+        Store an entry, whose key is known not to be in the table, Robin Hood style: walk its probe
+        sequence and swap it with the first entry that is closer to home, then carry on placing that one.
+        The size is not changed.
+        :param entry: entry to store
+        :return: none
+        """
+        buckets = self._buckets
+        capacity = self._capacity
+        index = entry.hash % capacity
+        distance = 0
+        slot = buckets.get_unchecked(index)
+        while slot is not None:
+            slot_distance = (index - slot.hash) % capacity
+            if slot_distance < distance:  # take from the rich, keep placing the entry that was displaced
+                buckets.set_unchecked(index, entry)
+                entry = slot
+                distance = slot_distance
+            distance += 1
+            index += 1
+            if index == capacity:
+                index = 0
+            slot = buckets.get_unchecked(index)
+        buckets.set_unchecked(index, entry)
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Update the key/value pair in the hash map. If the given key already exists in
+        the hash map, its associated value is replaced with the new value. If the given key is
+        not in the hash map, a new key/value pair is added.
+        :param key: string to be added
+        :param value: object to be added
+        :return: none
+        """
+        # table is resized to double its current capacity when the load factor reaches max_load
+        if self.table_load() >= self._max_load:
+            self.resize_table(self._capacity * 2)
+
+        hash = self._hash_function(key)
+        index = self._find(key, hash)
+        if index >= 0:
+            self._buckets.get_unchecked(index).value = value  # replace old value with new value if key exists
+        else:
+            self._place(HashEntry(key, value, hash))  # insert new key/value pair
+            self._size += 1
+
+    def table_load(self) -> float:
+        """
+        Returns the current hash table load factor.
+        :return: hash table load factor
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Return the number of empty buckets in the hash table.
+        :return: number of empty buckets
+        """
+        return self._capacity - self._size
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Change the capacity of the internal hash table. All existing key/value pairs
+        remain in the new hash map and are rehashed from their cached hashes.
+        If new_capacity is less than the current number of elements in the hash map, the method does nothing.
+        new_capacity is rounded up to a prime number, or to a power of two in power-of-two mode.
+        :param new_capacity: capacity of internal hash table
+        :return: none
+        """
+        if new_capacity < self._size or new_capacity < 1:
+            return
+
+        new_capacity = self._round_capacity(new_capacity)
+
+        # keep doubling until every entry fits under max_load
+        while self._size >= new_capacity * self._max_load:
+            new_capacity = self._round_capacity(new_capacity * 2)
+
+        start = time.perf_counter()
+        old_buckets = self._buckets
+        self._capacity = new_capacity
+        self._buckets = DynamicArray.filled(new_capacity)
+        for entry in old_buckets.get_slice():
+            if entry is not None:
+                self._place(entry)  # rehash using the cached hash instead of calling the hash function
+        self._rehashed += self._size
+        self._resizes += 1
+        self._resize_seconds += time.perf_counter() - start
+
+    def get(self, key: str) -> object:
+        """
+        Return the value associated with the given key. If the key is not in the hash map, the method returns None.
+        :param key: string/key associated with value
+        :return: string/key associated with value or none
+        """
+        index = self._find(key, self._hash_function(key))
+        if index >= 0:
+            return self._buckets.get_unchecked(index).value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Return True if the given key is in the hash map, otherwise it returns False.
+        :param key: string to search for in the hash map
+        :return: True or False
+        """
+        return self._find(key, self._hash_function(key)) >= 0
+
+    def remove(self, key: str) -> None:
+        """
+        Remove the given key and its associated value from the hash map. The entries after it
+        are shifted back one slot until one that is already in its home slot, or an empty slot,
+        so no tombstone is left behind.
+        :param key: string to remove in the hash map
+        :return: none
+        """
+        index = self._find(key, self._hash_function(key))
+        if index < 0:
+            return
+
+        buckets = self._buckets
+        capacity = self._capacity
+        next_index = index + 1 if index + 1 < capacity else 0
+        entry = buckets.get_unchecked(next_index)
+        while entry is not None and entry.hash % capacity != next_index:
+            buckets.set_unchecked(index, entry)
+            index = next_index
+            next_index = index + 1 if index + 1 < capacity else 0
+            entry = buckets.get_unchecked(next_index)
+        buckets.set_unchecked(index, None)
+        self._size -= 1
+
+    def clear(self) -> None:
+        """
+        Clear the contents of the hash map without changing its capacity.
+        :return: none
+        """
+        self._buckets.fill(None)
+        self._size = 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Return a dynamic array where each index contains a tuple of a key/value pair
+        stored in the hash map.
+        :return: dynamic array consisting of key/value pairs
+        """
+        new_array = DynamicArray()
+        for entry in self._buckets.get_slice():
+            if entry is not None:
+                new_array.append((entry.key, entry.value))  # store key/value pairs in new array
+        return new_array
+
+    def stats(self) -> dict:
+        """
+        Return health statistics for the hash map. Counters are maintained as the map changes;
+        the probe length distributions are measured on each call, which is O(capacity).
+        Probe lengths count the slots examined: for a hit, the key's displacement from its home slot
+        plus one, for a miss starting at each slot, up to and including the slot that ends the search.
+        :return: dictionary with size, capacity, load factor, hit and miss probe length distributions
+                 (probe length: count), longest hit probe, number of resizes, entries moved by resizes
+                 and seconds spent resizing
+        """
+        buckets = self._buckets.get_slice()
+        capacity = self._capacity
+        hits = {}
+        misses = {}
+        for i in range(capacity):
+            entry = buckets[i]
+            if entry is not None:
+                length = (i - entry.hash) % capacity + 1
+                hits[length] = hits.get(length, 0) + 1
+
+            # a miss whose home slot is i ends at an empty slot or an entry closer to home than the key
+            index = i
+            distance = 0
+            while buckets[index] is not None and (index - buckets[index].hash) % capacity >= distance:
+                distance += 1
+                index = (index + 1) % capacity
+            misses[distance + 1] = misses.get(distance + 1, 0) + 1
+
+        return {
+            'size': self._size,
+            'capacity': capacity,
+            'load': self.table_load(),
+            'probe_lengths_hit': dict(sorted(hits.items())),
+            'probe_lengths_miss': dict(sorted(misses.items())),
+            'max_probe': max(hits, default=0),
+            'resizes': self._resizes,
+            'rehashed_entries': self._rehashed,
+            'resize_seconds': self._resize_seconds,
+        }
+
+    def put_many(self, pairs) -> None:
+        """
+        Insert or update every key/value pair in pairs. The table is resized at most once,
+        up front, to a capacity that keeps the load factor below max_load for all pairs.
+        :param pairs: DynamicArray or iterable of (key, value) tuples
+        :return: none
+        """
+        items = as_list(pairs)
+        required = int((self._size + len(items)) / self._max_load) + 1  # upper bound, duplicates only lower it
+        if required > self._capacity:
+            self.resize_table(required)
+
+        buckets = self._buckets
+        hashes = hash_many(self._hash_function, [key for key, _ in items])
+        for (key, value), hash in zip(items, hashes):
+            index = self._find(key, hash)
+            if index >= 0:
+                buckets.get_unchecked(index).value = value
+            else:
+                self._place(HashEntry(key, value, hash))
+                self._size += 1
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Look up every key in keys.
+        :param keys: DynamicArray or iterable of keys
+        :return: dynamic array of the associated values, None for keys that are not in the map
+        """
+        result = DynamicArray()
+        find = self._find
+        buckets = self._buckets
+        keys = as_list(keys)
+        for key, hash in zip(keys, hash_many(self._hash_function, keys)):
+            index = find(key, hash)
+            result.append(buckets.get_unchecked(index).value if index >= 0 else None)
+        return result
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Check every key in keys for membership.
+        :param keys: DynamicArray or iterable of keys
+        :return: dynamic array of True or False, one per key
+        """
+        result = DynamicArray()
+        find = self._find
+        keys = as_list(keys)
+        for key, hash in zip(keys, hash_many(self._hash_function, keys)):
+            result.append(find(key, hash) >= 0)
+        return result
+
+    def __iter__(self):
+        """
+        Iterate over the entries of the hash map, in slot order.
+        """
+        buckets = self._buckets
+        for i in range(self._capacity):
+            entry = buckets.get_unchecked(i)
+            if entry is not None:
+                yield entry
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput, get, contains_key and remove")
+    print("---------------------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    print(m.get('str7'), m.contains_key('str7'), m.contains_key('str150'))
+    m.remove('str7')
+    print(m.get('str7'), m.contains_key('str7'), m.get_size(), m.get_tombstones())
+
+    print("\nprobe lengths at a load factor of 0.9")
+    print("-------------------------------------")
+    m = HashMap(1117, hash_function_fnv1a)
+    for i in range(1000):
+        m.put('key' + str(i), i)
+    stats = m.stats()
+    print(m.get_capacity(), round(m.table_load(), 2), stats['max_probe'], max(stats['probe_lengths_miss']))
+
+    print("\nresize_table, get_keys_and_values and iteration")
+    print("-----------------------------------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    m.resize_table(2)
+    print(m.get_keys_and_values())
+    m.put('20', '200')
+    m.remove('1')
+    m.resize_table(12)
+    print(m.get_keys_and_values())
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
@@ -7,34 +7,108 @@
 # collision resolution using a singly linked list.
 
 
-from a6_include import (DynamicArray, LinkedList,
-                        hash_function_1, hash_function_2)
+import heapq
+import itertools
+import math
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 
+from a6_include import (DynamicArray, LinkedList, MapViews, SLNode, as_list, finalized, hash_many, is_prime,
+                        iter_elements, next_power_of_two, next_prime, hash_function_1, hash_function_2)
+from hash_map_frozen import FrozenHashMap
+import hash_map_io
 
-class HashMap:
+# shared stand-in for every bucket that has never held a key: an empty bucket costs one reference
+# instead of a LinkedList object, and is swapped for a list of its own on its first insert
+_EMPTY_BUCKET = LinkedList()
+
+
+class HashMap(MapViews):
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 *,
+                 power_of_two: bool = False,
+                 incremental: bool = False,
+                 migrate_step: int = 8,
+                 max_load: float = 1.0,
+                 growth_factor: float = 2.0,
+                 min_capacity: int = None,
+                 shrink_load: float = None) -> None:
         """
         Initialize new HashMap that uses
         separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        With power_of_two=True, capacities are powers of two instead of primes, and hashes are passed
+        through mix_hash so that the bucket index, which then only depends on the low bits, uses all of them.
+        With incremental=True, growing the table is spread over the following operations,
+        each of which moves up to migrate_step buckets, instead of happening all at once in put.
+        The table grows by growth_factor once the load factor reaches max_load. Chains can hold any
+        number of nodes, so any positive max_load works: lower trades memory for shorter chains.
+        min_capacity, if given, is the smallest capacity the map is created with or shrinks to; by
+        default it is the capacity the map was created with. Explicit resize_table calls are not limited.
+        With shrink_load set, a remove that takes the load factor below it shrinks the table so the load
+        factor is back at half of max_load. shrink_load must be less than that, and less than max_load
+        divided by the growth factor, the load factor just after the table grows (in power-of-two mode
+        growth_factor rounded up to a power of two), so a shrunk or just grown map sits between the grow
+        and shrink thresholds and puts and removes around either one cannot make it resize back and forth.
+        Rounding up to a prime grows the table a little more than growth_factor, so leave some margin.
         """
-        self._buckets = DynamicArray()
+        if migrate_step < 1:
+            raise ValueError("migrate_step must be at least 1")
+        if not max_load > 0:
+            raise ValueError("max_load must be greater than 0")
+        if not growth_factor > 1:
+            raise ValueError("growth_factor must be greater than 1")
+        if min_capacity is not None and min_capacity < 1:
+            raise ValueError("min_capacity must be at least 1")
+        # the factor the table actually grows by: rounding to a power of two can make it larger
+        growth = next_power_of_two(math.ceil(growth_factor)) if power_of_two else growth_factor
+        if shrink_load is not None and not 0 < shrink_load < min(max_load / 2, max_load / growth):
+            raise ValueError("shrink_load must be greater than 0 and less than half of max_load "
+                             "and max_load divided by the growth factor")
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
+        if min_capacity is not None:
+            capacity = max(capacity, min_capacity)
+
+        self._power_of_two = power_of_two
+        if power_of_two:
+            self._capacity = next_power_of_two(capacity)
+            function = finalized(function)
+        else:
+            # capacity must be a prime number
+            self._capacity = self._next_prime(capacity)
+        self._buckets = DynamicArray.filled(self._capacity, _EMPTY_BUCKET)
 
         self._hash_function = function
         self._size = 0
+        self._max_load = max_load
+        self._growth_factor = growth_factor
+        self._shrink_load = shrink_load
+        self._min_capacity = self._capacity  # shrinking never goes below the capacity the map was created with
+
+        self._incremental = incremental
+        self._migrate_step = migrate_step
+        self._old_buckets = None  # table being migrated away from during an incremental resize
+        self._old_capacity = 0
+        self._migrate_index = 0  # old buckets below this index have been moved into self._buckets
+
+        # self._chains[n] is the number of buckets of self._buckets holding n nodes, kept up to date on
+        # every insert and remove so that stats() and empty_buckets() do not have to scan the table
+        self._chains = [self._capacity]
+        self._resizes = 0
+        self._shrinks = 0
+        self._rehashed = 0
+        self._resize_seconds = 0.0
 
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        Finishes an incremental resize first, so every entry is printed in its final bucket.
         """
+        self._finish_resize()
         out = ''
         for i in range(self._buckets.length()):
             out += str(i) + ': ' + str(self._buckets[i]) + '\n'
@@ -87,6 +161,23 @@ class HashMap:
         """
         return self._capacity
 
+    def _round_capacity(self, capacity: int) -> int:
+        """
+        Round a capacity up to a valid table size: a power of two in power-of-two mode, otherwise
+        a prime, found in the precomputed prime table instead of by trial division.
+        """
+        if self._power_of_two:
+            return next_power_of_two(capacity)
+        if is_prime(capacity):
+            return capacity
+        return next_prime(capacity)
+
+    def _grown_capacity(self, capacity: int) -> int:
+        """
+        Return the capacity a table of the given capacity grows to, before rounding.
+        """
+        return max(int(capacity * self._growth_factor), capacity + 1)
+
     # ------------------------------------------------------------------ #
 
     def put(self, key: str, value: object) -> None:
@@ -98,31 +189,183 @@ class HashMap:
         :param value: object to be added
         :return: none
         """
-        # table must be resized to double its current
+        # table must be resized to growth_factor (by default double) its current
         # capacity when this method is called and the current load factor of the table is
-        # greater than or equal to 1.0
-        if self.table_load() >= 1:
-            self.resize_table(self._capacity * 2)
+        # greater than or equal to max_load (by default 1.0)
+        if self.table_load() >= self._max_load:
+            if self._incremental:
+                self._start_resize(self._grown_capacity(self._capacity))
+            else:
+                self.resize_table(self._grown_capacity(self._capacity))
 
         hash = self._hash_function(key)  # compute a value based on the key
-        index = hash % self._capacity  # makes sure the value gets assigned to an index that exists in the array
+        buckets, index = self._locate(hash)  # makes sure the value gets assigned to a bucket that exists in the array
+        bucket = buckets.get_unchecked(index)
 
-        if self._buckets[index].contains(key):
-            self._buckets[index].contains(key).value = value  # replace old value with new value if key exists
+        node = bucket.contains(key, hash)
+        if node:
+            node.value = value  # replace old value with new value if key exists
         else:  # if key does not exist
-            self._buckets[index].insert(key, value)  # insert new key/value pair if key does not exist
+            if bucket is _EMPTY_BUCKET:  # first key in this bucket, give it a list of its own
+                bucket = LinkedList()
+                buckets.set_unchecked(index, bucket)
+            if buckets is self._buckets:
+                self._chain_grew(bucket.length())
+            bucket.insert(key, value, hash)  # insert new key/value pair if key does not exist
             self._size += 1
 
+    def _slot(self, key: str, default: object) -> (SLNode, bool):
+        """
+        Return the node holding key, adding it with the default value first if it is not in the hash map.
+        The map grows, hashes the key and walks its chain once, as put does.
+        :param key: string to look up or add
+        :param default: value for a new node
+        :return: tuple of the node and True if it was just added, False if the key was already there
+        """
+        if self.table_load() >= self._max_load:
+            if self._incremental:
+                self._start_resize(self._grown_capacity(self._capacity))
+            else:
+                self.resize_table(self._grown_capacity(self._capacity))
+
+        hash = self._hash_function(key)
+        buckets, index = self._locate(hash)
+        bucket = buckets.get_unchecked(index)
+
+        node = bucket.contains(key, hash)
+        if node:
+            return node, False
+        if bucket is _EMPTY_BUCKET:
+            bucket = LinkedList()
+            buckets.set_unchecked(index, bucket)
+        if buckets is self._buckets:
+            self._chain_grew(bucket.length())
+        self._size += 1
+        return bucket.insert(key, default, hash), True
+
+    def _chain_grew(self, length: int) -> None:
+        """
+        Record that a bucket of the current table holding length nodes is gaining one.
+        :param length: number of nodes in the bucket before the insert
+        :return: none
+        """
+        chains = self._chains
+        chains[length] -= 1
+        if length + 1 == len(chains):
+            chains.append(0)
+        chains[length + 1] += 1
+
+    def _chain_shrank(self, length: int) -> None:
+        """
+        Record that a bucket of the current table holding length nodes is losing one.
+        :param length: number of nodes in the bucket before the remove
+        :return: none
+        """
+        chains = self._chains
+        chains[length] -= 1
+        chains[length - 1] += 1
+
+    def _locate(self, hash: int) -> (DynamicArray, int):
+        """
+        Return the table and index of the bucket that holds, or would hold, keys with the given hash.
+        During an incremental resize this also migrates the next few buckets, and returns
+        the old table's bucket for keys whose old bucket has not been migrated yet.
+        :param hash: full hash of the key
+        :return: tuple of the table and the index of the bucket in it
+        """
+        if self._old_buckets is None:
+            return self._buckets, hash % self._capacity
+
+        self._migrate(self._migrate_step)
+        if self._old_buckets is not None:
+            old_index = hash % self._old_capacity
+            if old_index >= self._migrate_index:
+                return self._old_buckets, old_index
+        return self._buckets, hash % self._capacity
+
+    def _bucket(self, hash: int) -> LinkedList:
+        """
+        Return the bucket that holds, or would hold, keys with the given hash, for lookups only:
+        buckets that never held a key are the shared _EMPTY_BUCKET and must not be inserted into.
+        :param hash: full hash of the key
+        :return: linked list for the key
+        """
+        buckets, index = self._locate(hash)
+        return buckets.get_unchecked(index)
+
+    def _start_resize(self, new_capacity: int) -> None:
+        """
+        Begin an incremental resize: switch to an empty table of new_capacity buckets
+        and keep the current table around until all of its buckets have been migrated.
+        :param new_capacity: capacity of internal hash table
+        :return: none
+        """
+        self._finish_resize()
+        new_capacity = self._round_capacity(new_capacity)
+
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._buckets = DynamicArray.filled(new_capacity, _EMPTY_BUCKET)
+        self._capacity = new_capacity
+        self._migrate_index = 0
+        self._chains = [new_capacity]
+        self._resizes += 1
+
+    def _migrate(self, count: int) -> None:
+        """
+        Do one unit of incremental resize work: move up to count old buckets into the new table.
+        :param count: number of old buckets to move
+        :return: none
+        """
+        start = time.perf_counter()
+        end = min(self._migrate_index + count, self._old_capacity)
+        for bucket in self._old_buckets.get_slice(self._migrate_index, end):
+            if bucket is not _EMPTY_BUCKET:
+                self._relink(bucket.detach())
+        self._migrate_index = end
+
+        if end == self._old_capacity:  # migration complete
+            self._old_buckets = None
+            self._old_capacity = 0
+        self._resize_seconds += time.perf_counter() - start
+
+    def _finish_resize(self) -> None:
+        """
+        Complete any incremental resize in progress, so the whole map is in self._buckets.
+        :return: none
+        """
+        while self._old_buckets is not None:
+            self._migrate(self._old_capacity)
+
+    def _relink(self, node: SLNode) -> None:
+        """
+        Splice a chain of detached nodes into the current table using their cached hashes.
+        Keys are already unique, so no lookups are needed and no nodes are allocated.
+        :param node: first node of the chain
+        :return: none
+        """
+        buckets = self._buckets
+        capacity = self._capacity
+        chain_grew = self._chain_grew
+        while node:
+            next_node = node.next
+            index = node.hash % capacity
+            bucket = buckets.get_unchecked(index)
+            if bucket is _EMPTY_BUCKET:
+                bucket = LinkedList()
+                buckets.set_unchecked(index, bucket)
+            chain_grew(bucket.length())
+            bucket.insert_node(node)
+            self._rehashed += 1
+            node = next_node
+
     def empty_buckets(self) -> int:
         """
         Return the number of empty buckets in the hash table.
         :return: number of empty buckets
         """
-        count = 0
-        for i in range(self._buckets.length()):
-            if self._buckets[i].length() == 0:  # check if bucket is empty
-                count += 1
-        return count
+        self._finish_resize()
+        return self._chains[0]
 
     def table_load(self) -> float:
         """
@@ -136,10 +379,11 @@ class HashMap:
         Clear the contents of the hash map without changing the underlying hash table capacity.
         :return: none
         """
-        self._buckets = DynamicArray()
-        for i in range(self._capacity):
-            self._buckets.append(LinkedList())
+        self._old_buckets = None  # drop any incremental resize in progress
+        self._old_capacity = 0
+        self._buckets.fill(_EMPTY_BUCKET)  # no buckets are allocated until keys arrive again
         self._size = 0
+        self._chains = [self._capacity]
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -147,29 +391,34 @@ class HashMap:
         must remain in the new hash map, and all hash table links must be rehashed.
         If new_capacity is not less than 1, the method does nothing.
         If new_capacity is 1 or more, make sure it is a prime number. If not, change it to the next
-        highest prime number.
+        highest prime number. In power-of-two mode it is rounded up to a power of two instead.
         :param new_capacity: capacity of internal hash table
         :return: none
         """
         if new_capacity < 1:  # do nothing if new_capacity is less than 1
             return
 
-        if self._is_prime(new_capacity) is False:  # change non-prime number to next highest prime number
-            new_capacity = self._next_prime(new_capacity)
+        self._finish_resize()
 
-        new_hash_map = DynamicArray()  # create new array with new_capacity
-        for i in range(self._capacity):
-            new_hash_map.append(self._buckets[i])  # append elements onto new hash map
+        new_capacity = self._round_capacity(new_capacity)  # change non-prime number to next highest prime number
+
+        # keep growing until every entry fits under max_load, as put would while rehashing
+        while new_capacity * self._max_load < self._size:
+            new_capacity = self._round_capacity(self._grown_capacity(new_capacity))
 
-        self.clear()
+        start = time.perf_counter()
+        old_buckets = self._buckets
         self._capacity = new_capacity
-        self._buckets = DynamicArray()
-        for i in range(new_capacity):
-            self._buckets.append(LinkedList())
+        self._buckets = DynamicArray.filled(new_capacity, _EMPTY_BUCKET)  # create new array with new_capacity
+        self._chains = [new_capacity]
 
-        for i in range(new_hash_map.length()):
-            for j in new_hash_map[i]:
-                self.put(j.key, j.value)  # rehash into new hash map
+        # relink the existing nodes into their new buckets, no call to the hash function
+        for bucket in old_buckets.get_slice():
+            if bucket is not _EMPTY_BUCKET:
+                self._relink(bucket.detach())
+
+        self._resizes += 1
+        self._resize_seconds += time.perf_counter() - start
 
     def get(self, key: str):
         """
@@ -179,10 +428,10 @@ class HashMap:
         :return: string/key associated with value or none
         """
         hash = self._hash_function(key)
-        index = hash % self._capacity
 
-        if self._buckets[index].contains(key):  # check if key exists
-            return self._buckets[index].contains(key).value  # return the associated value
+        node = self._bucket(hash).contains(key, hash)
+        if node:  # check if key exists
+            return node.value  # return the associated value
 
     def contains_key(self, key: str) -> bool:
         """
@@ -191,25 +440,114 @@ class HashMap:
         :return: True or False
         """
         hash = self._hash_function(key)
-        index = hash % self._capacity
 
-        if self._buckets[index].contains(key):  # check if key exists
+        if self._bucket(hash).contains(key, hash):  # check if key exists
             return True
         else:  # key does not exist
             return False
 
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Return the value associated with the given key. If the key is not in the hash map,
+        it is added with the default value, which is returned.
+        :param key: string to look up or add
+        :param default: value to add if the key is not in the hash map
+        :return: value associated with the key
+        """
+        return self._slot(key, default)[0].value
+
+    def get_or_insert(self, key: str, factory) -> object:
+        """
+        Return the value associated with the given key. If the key is not in the hash map,
+        factory is called with no arguments and its result is added and returned, so values that are
+        costly to build are only built for new keys.
+        :param key: string to look up or add
+        :param factory: callable that returns the value for a new key
+        :return: value associated with the key
+        """
+        node, added = self._slot(key, None)
+        if added:
+            try:
+                node.value = factory()
+            except BaseException:
+                self._discard(key)  # take the new key out again, without shrinking the table
+                raise
+        return node.value
+
+    def increment(self, key: str, delta=1):
+        """
+        Add delta to the value associated with the given key. If the key is not in the hash map,
+        it is added with delta as its value.
+        :param key: string whose count to change
+        :param delta: amount to add
+        :return: the new value
+        """
+        node, added = self._slot(key, delta)
+        if not added:
+            node.value += delta
+        return node.value
+
+    def update(self, key: str, function, default: object = None) -> object:
+        """
+        Replace the value associated with the given key by function(value). If the key is not in the
+        hash map, it is added with the value function(default).
+        :param key: string whose value to change
+        :param function: callable that takes the current value and returns the new one
+        :param default: value passed to function if the key is not in the hash map
+        :return: the new value
+        """
+        node, added = self._slot(key, default)
+        try:
+            node.value = function(node.value)
+        except BaseException:
+            if added:
+                self._discard(key)  # take the new key out again, without shrinking the table
+            raise
+        return node.value
+
     def remove(self, key: str) -> None:
         """
         Remove the given key and its associated value from the hash map.
         :param key: string to remove in the hash map
         :return: none
         """
+        if (self._discard(key) and self._shrink_load is not None
+                and self._size < self._shrink_load * self._capacity and self._capacity > self._min_capacity):
+            self._shrink()
+
+    def _discard(self, key: str) -> bool:
+        """
+        Remove the given key and its associated value from the hash map, leaving the capacity as it is.
+        :param key: string to remove in the hash map
+        :return: True if the key was removed, False if it was not in the hash map
+        """
         hash = self._hash_function(key)
-        index = hash % self._capacity
+        buckets, index = self._locate(hash)
+        bucket = buckets.get_unchecked(index)
+        length = bucket.length()
 
-        if self._buckets[index].contains(key):  # check if key exists
-            self._buckets[index].remove(key)  # removes first node with matching key
-            self._size -= 1  # decrement size if removal successful
+        if not bucket.remove(key, hash):  # removes first node with matching key
+            return False
+        self._size -= 1  # decrement size if removal successful
+        if length == 1:  # bucket is empty again, give its list back
+            buckets.set_unchecked(index, _EMPTY_BUCKET)
+        if buckets is self._buckets:
+            self._chain_shrank(length)
+        return True
+
+    def _shrink(self) -> None:
+        """
+        Shrink the table to the capacity that puts the load factor at half of max_load, or to the minimum capacity.
+        :return: none
+        """
+        new_capacity = self._round_capacity(max(math.ceil(self._size * 2 / self._max_load), self._min_capacity))
+        if new_capacity >= self._capacity:
+            return
+        self._shrinks += 1
+        if self._incremental:
+            self._start_resize(new_capacity)
+        else:
+            self.resize_table(new_capacity)
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -217,12 +555,186 @@ class HashMap:
         stored in the hash map.
         :return: dynamic array consisting of key/value pairs
         """
+        self._finish_resize()
         new_array = DynamicArray()
-        for i in range(self._buckets.length()):
-            for j in self._buckets[i]:
+        for bucket in self._buckets.get_slice():
+            for j in bucket:
                 new_array.append((j.key, j.value))  # store tuples of key/value pairs in new array
         return new_array
 
+    def stats(self) -> dict:
+        """
+        Return health statistics for the hash map. Everything is maintained as the map changes,
+        so polling costs O(longest chain) rather than a scan of the table. During an incremental
+        resize the chain statistics cover only the buckets already in the new table.
+        :return: dictionary with size, capacity, load factor, empty buckets, chain length distribution
+                 (chain length: number of buckets), longest chain, number of resizes and how many of them
+                 were shrinks, entries moved by resizes, seconds spent resizing and whether an incremental
+                 resize is in progress
+        """
+        chains = self._chains
+        longest = len(chains) - 1
+        while longest > 0 and chains[longest] == 0:
+            longest -= 1
+        return {
+            'size': self._size,
+            'capacity': self._capacity,
+            'load': self.table_load(),
+            'empty_buckets': chains[0],
+            'chain_lengths': {length: count for length, count in enumerate(chains) if count},
+            'max_chain': longest,
+            'resizes': self._resizes,
+            'shrinks': self._shrinks,
+            'rehashed_entries': self._rehashed,
+            'resize_seconds': self._resize_seconds,
+            'resizing': self._old_buckets is not None,
+        }
+
+    def put_many(self, pairs) -> None:
+        """
+        Insert or update every key/value pair in pairs. The table is resized at most once,
+        up front, to a capacity large enough for all pairs, so no resize happens mid-batch.
+        :param pairs: DynamicArray or iterable of (key, value) tuples
+        :return: none
+        """
+        items = as_list(pairs)
+        required = self._size + len(items)  # upper bound, duplicate keys only make it smaller
+        if required > self._capacity * self._max_load:
+            self.resize_table(math.ceil(required / self._max_load))
+        else:
+            self._finish_resize()
+
+        buckets = self._buckets
+        capacity = self._capacity
+        hashes = hash_many(self._hash_function, [key for key, _ in items])
+        for (key, value), hash in zip(items, hashes):
+            index = hash % capacity
+            bucket = buckets.get_unchecked(index)
+            node = bucket.contains(key, hash)
+            if node:
+                node.value = value  # replace old value with new value if key exists
+            else:
+                if bucket is _EMPTY_BUCKET:
+                    bucket = LinkedList()
+                    buckets.set_unchecked(index, bucket)
+                self._chain_grew(bucket.length())
+                bucket.insert(key, value, hash)
+                self._size += 1
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Look up every key in keys.
+        :param keys: DynamicArray or iterable of keys
+        :return: dynamic array of the associated values, None for keys that are not in the map
+        """
+        self._finish_resize()
+        result = DynamicArray()
+        buckets = self._buckets
+        capacity = self._capacity
+        keys = as_list(keys)
+        for key, hash in zip(keys, hash_many(self._hash_function, keys)):
+            node = buckets.get_unchecked(hash % capacity).contains(key, hash)
+            result.append(node.value if node else None)
+        return result
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Check every key in keys for membership.
+        :param keys: DynamicArray or iterable of keys
+        :return: dynamic array of True or False, one per key
+        """
+        self._finish_resize()
+        result = DynamicArray()
+        buckets = self._buckets
+        capacity = self._capacity
+        keys = as_list(keys)
+        for key, hash in zip(keys, hash_many(self._hash_function, keys)):
+            result.append(buckets.get_unchecked(hash % capacity).contains(key, hash) is not None)
+        return result
+
+    def __iter__(self):
+        """
+        Iterate over the nodes of the hash map, in bucket order, as SLNode objects with key and value.
+        Each call returns a new, independent iterator, so iterations can be nested. A resize in progress
+        is finished first.
+        """
+        self._finish_resize()
+        buckets = self._buckets
+        for i in range(self._capacity):
+            yield from buckets.get_unchecked(i)
+
+    def dump(self, path: str) -> None:
+        """
+        Save the hash map to path in the binary format of hash_map_io, with every node's cached hash and
+        bucket, so that load() can rebuild it without rehashing and MappedHashMap can read it in place.
+        A resize in progress is finished first.
+        :param path: file to write
+        :return: none
+        """
+        self._finish_resize()
+        entries = []
+        buckets = self._buckets
+        for i in range(self._capacity):
+            for node in buckets.get_unchecked(i):
+                entries.append((i, node.key, node.value, node.hash))
+        hash_map_io.write(path, 'sc', self._capacity, entries, function=self._hash_function,
+                          power_of_two=self._power_of_two, max_load=self._max_load,
+                          growth_factor=self._growth_factor, shrink_load=self._shrink_load,
+                          min_capacity=self._min_capacity)
+
+    @classmethod
+    def load(cls, path: str, function=hash_function_1, **options) -> "HashMap":
+        """
+        Rebuild a hash map saved by dump(), with the same settings, at the same capacity and with every
+        chain in the same order. Nodes are linked straight into their saved buckets with their saved
+        hashes: the hash function is only called once, to check that it is the one the map was saved with.
+        Values without a compact encoding are unpickled, so only load files from a trusted source.
+        :param path: file to read
+        :param function: hash function the map was built with
+        :param options: other keyword arguments for the constructor, such as incremental; they override
+                        the saved settings, except power_of_two, which sets where each entry is stored;
+                        min_capacity=None keeps the saved minimum capacity
+        :return: the hash map
+        """
+        header, entries = hash_map_io.read(path, 'sc', function)
+        capacity = header['capacity']
+        settings = {'power_of_two': header['power_of_two'], 'max_load': header['max_load'],
+                    'growth_factor': header['growth_factor'], 'shrink_load': header['shrink_load'],
+                    'min_capacity': header['min_capacity']}
+        if options.get('power_of_two', header['power_of_two']) != header['power_of_two']:  # saved buckets would not hold
+            raise ValueError("power_of_two cannot be changed when loading a hash map")
+        settings.update(options)
+        if settings['min_capacity'] is None:
+            settings['min_capacity'] = header['min_capacity']
+        m = cls(capacity, function, **settings)
+        if m._capacity != capacity:  # the constructor rounds a capacity of 2 up, and applies min_capacity
+            m.resize_table(capacity)
+        m._min_capacity = m._round_capacity(settings['min_capacity'])  # not the capacity it was created with
+
+        buckets = m._buckets
+        chains = m._chains
+        for index, group in itertools.groupby(entries, key=itemgetter(0)):
+            group = list(group)
+            bucket = LinkedList()
+            for _, key, value, hash in reversed(group):  # inserting at the front reverses the order
+                bucket.insert(key, value, hash)
+            buckets.set_unchecked(index, bucket)
+            chains[0] -= 1
+            while len(chains) <= len(group):
+                chains.append(0)
+            chains[len(group)] += 1
+        m._size = len(entries)
+        return m
+
+    def freeze(self, **options) -> FrozenHashMap:
+        """
+        Return an immutable copy of the hash map built around a minimal perfect hash, for maps that are
+        only read from now on: every lookup reads one slot, and there is exactly one slot per key.
+        :param options: keyword arguments for FrozenHashMap, such as bucket_size
+        :return: frozen hash map of the key/value pairs from get_keys_and_values
+        """
+        return FrozenHashMap(self.get_keys_and_values(), **options)
+
 
 def find_mode(da: DynamicArray) -> (DynamicArray, int):
     """
@@ -236,16 +748,20 @@ def find_mode(da: DynamicArray) -> (DynamicArray, int):
     mode_array = DynamicArray()
 
     for i in range(da.length()):
-        key = da[i]
-        if map.contains_key(key):  # if key exists
-            frequency = map.get(key)  # return value associated with key
-            map.put(key, frequency + 1)  # update array with element and increment count
-            if frequency + 1 > max_frequency:  # set max
-                max_frequency = frequency + 1
-        else:  # if key does not exist, frequency is 1
-            if max_frequency == 0:
-                max_frequency = 1
-            map.put(key, 1)
+        frequency = map.increment(da[i])  # count the element, adding it with a count of 1 if it is new
+        if frequency > max_frequency:  # set max
+            max_frequency = frequency
+    return _collect_modes(map, max_frequency, mode_array)
+
+
+def _collect_modes(map: HashMap, max_frequency: int, mode_array: DynamicArray) -> (DynamicArray, int):
+    """
+    Scan the counts of find_mode, in bucket order, for the keys that reach max_frequency.
+    :param map: hash map of key counts
+    :param max_frequency: highest count in the map
+    :param mode_array: dynamic array to append the mode/s to
+    :return: tuple of mode_array and the highest frequency
+    """
     for i in range(map.get_capacity()):
         for j in map._buckets[i]:
             if j.value == max_frequency:  # if bucket's value is the same as max
@@ -256,6 +772,109 @@ def find_mode(da: DynamicArray) -> (DynamicArray, int):
                 mode_array.append(j.value)
     return mode_array, max_frequency
 
+
+def _count_chunk(keys: list) -> (list, list):
+    """
+    Count the keys of one chunk of find_mode_parallel, in a worker process.
+    Only the distinct keys and their counts are sent back, not the hash map.
+    :param keys: list of keys
+    :return: tuple of the distinct keys, in order of first occurrence, and their counts
+    """
+    counts = HashMap()
+    order = []
+    for key in keys:
+        if counts.increment(key) == 1:
+            order.append(key)
+    return order, [counts.get(key) for key in order]
+
+
+def _merge_counts(counts: HashMap, partials) -> int:
+    """
+    Add the partial counts of find_mode_parallel to counts, in chunk order.
+    :param counts: hash map of key counts
+    :param partials: iterable of the results of _count_chunk
+    :return: the highest count in counts
+    """
+    max_frequency = 0
+    for keys, frequencies in partials:
+        for key, frequency in zip(keys, frequencies):
+            frequency = counts.increment(key, frequency)
+            if frequency > max_frequency:
+                max_frequency = frequency
+    return max_frequency
+
+
+def find_mode_parallel(da: DynamicArray, workers: int = None, chunks: int = None) -> (DynamicArray, int):
+    """
+    Return exactly what find_mode returns, counting chunks of the array in a pool of worker processes.
+    The partial counts are merged in chunk order, so keys reach the merged hash map in the order of their first
+    occurrence in the array, as they do in find_mode, and the buckets and the mode order come out the same.
+    :param da: dynamic array to be calculated
+    :param workers: number of worker processes, by default one per CPU; 1 counts in this process
+    :param chunks: number of chunks to split the array into, by default one per worker
+    :return: dynamic array with tuples containing mode and highest frequency
+    """
+    if workers is not None and workers < 1 or chunks is not None and chunks < 1:
+        raise ValueError("workers and chunks must be at least 1")
+    workers = workers or os.cpu_count() or 1
+    chunks = chunks or workers
+
+    length = da.length()
+    bounds = [length * i // chunks for i in range(chunks + 1)]
+    parts = (da.get_slice(bounds[i], bounds[i + 1]) for i in range(chunks))
+    counts = HashMap()
+    if workers == 1:
+        max_frequency = _merge_counts(counts, map(_count_chunk, parts))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            max_frequency = _merge_counts(counts, pool.map(_count_chunk, parts))
+
+    # find_mode checks the load factor once more after its last new key unless that key is the
+    # last element, and a resize there would reorder the buckets; an increment by 0 does the same
+    if length and counts.get(da[length - 1]) > 1:
+        counts.increment(da[length - 1], 0)
+    return _collect_modes(counts, max_frequency, DynamicArray())
+
+
+def find_mode_stream(keys) -> (DynamicArray, int):
+    """
+    Return the same mode/s and highest frequency as find_mode, from a single pass over keys, which can be any
+    iterable or generator and is never stored. The highest frequency and the keys that reach it are kept up
+    to date as the keys arrive, so no scan of the hash map is needed at the end. The modes are in the order
+    in which they reached the highest frequency.
+    :param keys: dynamic array, iterable or generator of keys
+    :return: tuple of a dynamic array with the mode/s and the highest frequency
+    """
+    counts = HashMap()
+    max_frequency = 0
+    mode_array = DynamicArray()
+
+    for key in iter_elements(keys):
+        frequency = counts.increment(key)
+        if frequency > max_frequency:  # key is now the only mode
+            max_frequency = frequency
+            mode_array = DynamicArray()
+            mode_array.append(key)
+        elif frequency == max_frequency:  # key joins the modes
+            mode_array.append(key)
+    return mode_array, max_frequency
+
+
+def find_top_k(keys, k: int) -> DynamicArray:
+    """
+    Return the k most frequent keys, counted in a single pass over keys, which can be any iterable or generator.
+    Selecting them takes one pass over the distinct keys and a heap of k entries, not a sort of every key.
+    :param keys: dynamic array, iterable or generator of keys
+    :param k: number of keys to return
+    :return: dynamic array of (key, frequency) tuples, most frequent first, ties in no particular order
+    """
+    if k < 1:
+        raise ValueError("k must be at least 1")
+    counts = HashMap()
+    for key in iter_elements(keys):
+        counts.increment(key)
+    return DynamicArray(heapq.nlargest(k, counts.get_keys_and_values().get_slice(), key=itemgetter(1)))
+
 # ------------------- BASIC TESTING ---------------------------------------- #
 
 if __name__ == "__main__":
@@ -456,3 +1075,63 @@ if __name__ == "__main__":
         da = DynamicArray(case)
         mode, frequency = find_mode(da)
         print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}\n")
+
+    print("\nput_many, get_many and contains_many")
+    print("------------------------------------")
+    m = HashMap(11, hash_function_2)
+    m.put_many(DynamicArray([(str(i), i * 10) for i in range(20)]))
+    print(m.get_size(), m.get_capacity(), m.get_many(['3', '19', '20']), m.contains_many(['3', '19', '20']))
+
+    print("\nincremental resizing and shrinking")
+    print("----------------------------------")
+    m = HashMap(11, hash_function_1, incremental=True, migrate_step=2, shrink_load=0.2)
+    for i in range(40):
+        m.put('key' + str(i), i)
+        if i == 25:  # part way through moving the buckets to the grown table
+            print(m.get_capacity(), m.stats()['resizing'], m.get('key3'), m.get('key25'))
+    stats = m.stats()
+    print(m.get_capacity(), stats['resizes'], stats['resizing'], m.get('key3'), m.get('key39'))
+    for i in range(36):
+        m.remove('key' + str(i))
+    stats = m.stats()
+    print(m.get_size(), m.get_capacity(), stats['shrinks'], sorted(m.keys()))
+
+    print("\nsetdefault, get_or_insert, increment and update")
+    print("-----------------------------------------------")
+    m = HashMap(11, hash_function_1)
+    print(m.setdefault('a', 1), m.setdefault('a', 2), m.get_or_insert('b', list), m.increment('c'), m.increment('c', 5))
+    print(m.update('a', lambda value: value * 10), m.update('d', len, 'four'), sorted(m.items()))
+    try:
+        m.update('e', len, 5)
+    except TypeError:
+        print(m.contains_key('e'), m.get_size())  # a failed update takes the new key out again
+
+    print("\nfind_mode_stream, find_top_k and find_mode_parallel")
+    print("---------------------------------------------------")
+    case = test_cases[2]
+    mode, frequency = find_mode_stream(key for key in case)
+    print(f"Input: {case}\nMode : {mode}, Frequency: {frequency}")
+    print(find_top_k(case, 3))
+    da = DynamicArray(case)
+    mode, frequency = find_mode_parallel(da, workers=2, chunks=3)
+    print(f"Mode : {mode}, Frequency: {frequency}, same as find_mode: {str(find_mode(da)[0]) == str(mode)}")
+
+    print("\ndump, load, MappedHashMap and freeze")
+    print("------------------------------------")
+    m = HashMap(11, hash_function_2, max_load=0.75, growth_factor=3.0, shrink_load=0.2)
+    for i in range(30):
+        m.put('key' + str(i), i)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'map.bin')
+        m.dump(path)
+        loaded = HashMap.load(path, hash_function_2)
+        print(loaded.get_size(), loaded.get_capacity() == m.get_capacity(),
+              str(loaded.get_keys_and_values()) == str(m.get_keys_and_values()))
+        with hash_map_io.MappedHashMap(path, hash_function_2) as mapped:
+            print(mapped.get_size(), mapped.get('key7'), mapped.contains_key('key7'), mapped.get('key30'))
+        try:
+            HashMap.load(path, hash_function_1)
+        except ValueError:
+            print("load with a different hash function is refused")
+    frozen = m.freeze()
+    print(frozen.get_size(), frozen.get('key7'), frozen.get('key30'), sorted(frozen.items()) == sorted(m.items()))
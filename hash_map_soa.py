@@ -0,0 +1,398 @@
+# Course: CS261 - Data Structures
+# Assignment: 6 - HashMap
+# Description: Open Addressing HashMap with Quadratic Probing that stores its table as parallel arrays
+# (keys, values, cached hashes and a byte of state per slot) instead of one HashEntry object per slot.
+# It supports the core API of hash_map_oa.HashMap (put, get, contains_key, remove, resize_table, clear,
+# get_keys_and_values, the *_many bulk operations, iteration and the keys/values/items views) at a fraction
+# of the memory per entry, but not its probe strategies, incremental resizing, configurable growth,
+# upsert methods, stats, dump/load or freeze.
+
+from array import array
+
+from a6_include import (DynamicArray, HashEntry, MapViews, MASK_64, as_list, hash_many, hash_function_1,
+                        hash_function_2)
+
+# slot states
+EMPTY = 0
+LIVE = 1
+TOMBSTONE = 2
+
+
+class HashMap(MapViews):
+    def __init__(self, capacity: int, function, *, tombstone_ratio: float = 0.25) -> None:
+        """
+        Initialize new HashMap that uses
+        quadratic probing for collision resolution
+        Once tombstones fill tombstone_ratio of the table, it is rebuilt in place to reclaim them.
+        """
+        if not 0 < tombstone_ratio <= 0.5:
+            raise ValueError("tombstone_ratio must be greater than 0 and at most 0.5")
+
+        self._hash_function = function
+        self._tombstone_ratio = tombstone_ratio
+        self._allocate(self._next_prime(capacity))
+        self._size = 0
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Replace the table with an empty one of the given capacity.
+        :param capacity: number of slots
+        :return: none
+        """
+        self._capacity = capacity
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._hashes = array('Q', bytes(8 * capacity))
+        self._states = bytearray(capacity)
+        self._tombstones = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._states[i] == EMPTY:
+                out += str(i) + ': None\n'
+            else:
+                out += (str(i) + ': K: ' + str(self._keys[i]) + ' V: ' + str(self._values[i])
+                        + ' TS: ' + str(self._states[i] == TOMBSTONE) + '\n')
+        return out
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        """
+        if capacity % 2 == 0:
+            capacity += 1
+
+        while not self._is_prime(capacity):
+            capacity += 2
+
+        return capacity
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        if capacity == 2 or capacity == 3:
+            return True
+
+        if capacity == 1 or capacity % 2 == 0:
+            return False
+
+        factor = 3
+        while factor ** 2 <= capacity:
+            if capacity % factor == 0:
+                return False
+            factor += 2
+
+        return True
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    def get_tombstones(self) -> int:
+        """
+        Return number of removed entries still occupying a slot
+        """
+        return self._tombstones
+
+    # ------------------------------------------------------------------ #
+
+    def _find(self, key: str, hash: int) -> int:
+        """
+        Probe for the slot holding the given key.
+        :param key: string to search for
+        :param hash: cached (64-bit) hash of the key
+        :return: index of the key's slot, or -1 if the key is not in the hash map
+        """
+        states = self._states
+        hashes = self._hashes
+        keys = self._keys
+        capacity = self._capacity
+        index = hash % capacity
+        j = 0
+        quad_index = index
+        step = 1
+        while states[quad_index] != EMPTY and j < capacity:
+            if states[quad_index] == LIVE and hashes[quad_index] == hash and keys[quad_index] == key:
+                return quad_index
+            # continue probing for key
+            j += 1
+            quad_index = (quad_index + step) % capacity  # index + j^2, stepping by 2j - 1
+            step += 2
+        return -1
+
+    def _place(self, key: str, value: object, hash: int) -> None:
+        """
+        Store a key, known not to be in the table, in the first free slot of its probe sequence.
+        The size is not changed.
+        :param key: string to be added
+        :param value: object to be added
+        :param hash: cached (64-bit) hash of the key
+        :return: none
+        """
+        states = self._states
+        capacity = self._capacity
+        index = hash % capacity
+        quad_index = index
+        step = 1
+        while states[quad_index] == LIVE:
+            quad_index = (quad_index + step) % capacity
+            step += 2
+        if states[quad_index] == TOMBSTONE:
+            self._tombstones -= 1
+        states[quad_index] = LIVE
+        self._keys[quad_index] = key
+        self._values[quad_index] = value
+        self._hashes[quad_index] = hash
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Update the key/value pair in the hash map. If the given key already exists in
+        the hash map, its associated value is replaced with the new value, without allocating anything.
+        If the given key is not in the hash map, a new key/value pair is added.
+        :param key: string to be added
+        :param value: object to be added
+        :return: none
+        """
+        # table is resized to double its current capacity when the load factor is at least 0.5
+        if self.table_load() >= 0.5:
+            self.resize_table(self._capacity * 2)
+
+        hash = self._hash_function(key) & MASK_64
+        states = self._states
+        hashes = self._hashes
+        keys = self._keys
+        capacity = self._capacity
+        index = hash % capacity
+
+        # remember the first tombstone but keep probing until an empty slot proves the key is absent
+        tombstone_index = -1
+        j = 0
+        quad_index = index
+        step = 1
+        while states[quad_index] != EMPTY and j < capacity:
+            if states[quad_index] == TOMBSTONE:
+                if tombstone_index < 0:
+                    tombstone_index = quad_index
+            elif hashes[quad_index] == hash and keys[quad_index] == key:  # if key exists
+                self._values[quad_index] = value
+                return
+            j += 1
+            quad_index = (quad_index + step) % capacity
+            step += 2
+
+        if tombstone_index >= 0:  # reuse the first tombstone on the probe sequence
+            quad_index = tombstone_index
+            self._tombstones -= 1
+        states[quad_index] = LIVE
+        keys[quad_index] = key
+        self._values[quad_index] = value
+        hashes[quad_index] = hash
+        self._size += 1
+
+    def table_load(self) -> float:
+        """
+        Returns the current hash table load factor.
+        :return: hash table load factor
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Return the number of empty buckets in the hash table.
+        :return: number of empty buckets, tombstones included
+        """
+        return self._capacity - self._size
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Change the capacity of the internal hash table. All existing key/value pairs
+        remain in the new hash map and are rehashed from their cached hashes.
+        If new_capacity is less than the current number of elements in the hash map, the method does nothing.
+        new_capacity is rounded up to a prime number.
+        :param new_capacity: capacity of internal hash table
+        :return: none
+        """
+        if new_capacity < self._size or new_capacity < 1:
+            return
+
+        if self._is_prime(new_capacity) is False:
+            new_capacity = self._next_prime(new_capacity)
+
+        # keep doubling until every entry fits under a load factor of 0.5
+        while (self._size - 1) * 2 >= new_capacity:
+            new_capacity = self._next_prime(new_capacity * 2)
+
+        self._rebuild(new_capacity)
+
+    def _rebuild(self, capacity: int) -> None:
+        """
+        Move every live entry into a fresh table of the given capacity.
+        :param capacity: number of slots
+        :return: none
+        """
+        old_states, old_keys, old_values, old_hashes = self._states, self._keys, self._values, self._hashes
+        self._allocate(capacity)
+        place = self._place
+        for i in range(len(old_states)):
+            if old_states[i] == LIVE:
+                place(old_keys[i], old_values[i], old_hashes[i])
+
+    def get(self, key: str) -> object:
+        """
+        Return the value associated with the given key. If the key is not in the hash map, the method returns None.
+        :param key: string/key associated with value
+        :return: string/key associated with value or none
+        """
+        index = self._find(key, self._hash_function(key) & MASK_64)
+        if index >= 0:
+            return self._values[index]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Return True if the given key is in the hash map, otherwise it returns False.
+        :param key: string to search for in the hash map
+        :return: True or False
+        """
+        return self._find(key, self._hash_function(key) & MASK_64) >= 0
+
+    def remove(self, key: str) -> None:
+        """
+        Remove the given key and its associated value from the hash map.
+        :param key: string to remove in the hash map
+        :return: none
+        """
+        index = self._find(key, self._hash_function(key) & MASK_64)
+        if index >= 0:
+            self._states[index] = TOMBSTONE
+            self._keys[index] = None  # let go of the key and value right away
+            self._values[index] = None
+            self._size -= 1
+            self._tombstones += 1
+            if self._tombstones >= self._tombstone_ratio * self._capacity:
+                self._rebuild(self._capacity)  # too many tombstones to probe through, reclaim them
+
+    def clear(self) -> None:
+        """
+        Clear the contents of the hash map without changing its capacity.
+        :return: none
+        """
+        self._allocate(self._capacity)
+        self._size = 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Return a dynamic array where each index contains a tuple of a key/value pair
+        stored in the hash map.
+        :return: dynamic array consisting of key/value pairs
+        """
+        new_array = DynamicArray()
+        states, keys, values = self._states, self._keys, self._values
+        for i in range(self._capacity):
+            if states[i] == LIVE:
+                new_array.append((keys[i], values[i]))
+        return new_array
+
+    def put_many(self, pairs) -> None:
+        """
+        Insert or update every key/value pair in pairs. The table is resized at most once,
+        up front, to a capacity that keeps the load factor below 0.5 for all pairs.
+        :param pairs: DynamicArray or iterable of (key, value) tuples
+        :return: none
+        """
+        items = as_list(pairs)
+        required = self._size + len(items)  # upper bound, duplicate keys only make it smaller
+        if required * 2 > self._capacity:
+            self.resize_table(required * 2)
+
+        values = self._values
+        hashes = hash_many(self._hash_function, [key for key, _ in items])
+        for (key, value), hash in zip(items, hashes):
+            hash &= MASK_64
+            index = self._find(key, hash)
+            if index >= 0:
+                values[index] = value
+            else:
+                self._place(key, value, hash)
+                self._size += 1
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Look up every key in keys.
+        :param keys: DynamicArray or iterable of keys
+        :return: dynamic array of the associated values, None for keys that are not in the map
+        """
+        result = DynamicArray()
+        find = self._find
+        values = self._values
+        keys = as_list(keys)
+        for key, hash in zip(keys, hash_many(self._hash_function, keys)):
+            index = find(key, hash & MASK_64)
+            result.append(values[index] if index >= 0 else None)
+        return result
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Check every key in keys for membership.
+        :param keys: DynamicArray or iterable of keys
+        :return: dynamic array of True or False, one per key
+        """
+        result = DynamicArray()
+        find = self._find
+        keys = as_list(keys)
+        for key, hash in zip(keys, hash_many(self._hash_function, keys)):
+            result.append(find(key, hash & MASK_64) >= 0)
+        return result
+
+    def __iter__(self):
+        """
+        Iterate over the entries of the hash map, in slot order, as HashEntry objects.
+        Entries are created on the fly, so changing them does not change the map.
+        """
+        states, keys, values, hashes = self._states, self._keys, self._values, self._hashes
+        for i in range(self._capacity):
+            if states[i] == LIVE:
+                yield HashEntry(keys[i], values[i], hashes[i])
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput, get, contains_key and remove")
+    print("---------------------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    print(m.get('str7'), m.contains_key('str7'), m.contains_key('str150'))
+    m.remove('str7')
+    print(m.get('str7'), m.contains_key('str7'), m.get_size(), m.get_tombstones())
+
+    print("\nresize_table, get_keys_and_values and iteration")
+    print("-----------------------------------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    m.resize_table(2)
+    print(m.get_keys_and_values())
+    m.put('20', '200')
+    m.remove('1')
+    m.resize_table(12)
+    print(m.get_keys_and_values())
+    for item in m:
+        print('K:', item.key, 'V:', item.value)